@@ -1,10 +1,14 @@
 # BackTrader-Agent package
 import os
 import sys
-from dotenv import load_dotenv
 
-# Automatically load .env file
-load_dotenv()
+# Automatically load .env file; python-dotenv is optional for environments that set variables directly
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    pass
+else:
+    load_dotenv()
 
 # Add current directory to path
 sys.path.append('.')
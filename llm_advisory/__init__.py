@@ -1,17 +1,30 @@
-from .bt_advisor import BacktraderLLMAdvisor
-from .bt_advisory import BacktraderLLMAdvisory
-from .llm_advisor import LLMAdvisor, AdvisoryAdvisor, PersonaAdvisor, check_llm_service_availability
+# 子模块按需导入：只用到 llm_advisory.pydantic_models 等轻量模块时，不必加载 backtrader 与全部 advisor
+_LAZY_ATTRS = {
+    "BacktraderLLMAdvisor": ".bt_advisor",
+    "BacktraderLLMAdvisory": ".bt_advisory",
+    "LLMAdvisor": ".llm_advisor",
+    "AdvisoryAdvisor": ".llm_advisor",
+    "PersonaAdvisor": ".llm_advisor",
+    "check_llm_service_availability": ".llm_advisor",
+    # Advisors
+    "BacktraderTrendAdvisor": ".advisors",
+    "BacktraderTechnicalAnalysisAdvisor": ".advisors",
+    "BacktraderCandlePatternAdvisor": ".advisors",
+    "BacktraderFeedbackAdvisor": ".advisors",
+    "BacktraderPersonaAdvisor": ".advisors",
+    "BacktraderStrategyAdvisor": ".advisors",
+    "BacktraderReversalAdvisor": ".advisors",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Import advisors
-from .advisors import (
-    BacktraderTrendAdvisor,
-    BacktraderTechnicalAnalysisAdvisor,
-    BacktraderCandlePatternAdvisor,
-    BacktraderFeedbackAdvisor,
-    BacktraderPersonaAdvisor,
-    BacktraderStrategyAdvisor,
-    BacktraderReversalAdvisor
-)
 
 __version__ = "0.0.1"
 
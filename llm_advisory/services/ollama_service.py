@@ -17,6 +17,8 @@ class OllamaService:
         """Initialize Ollama client with configuration from environment"""
         self.base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
         self.model = os.getenv('OLLAMA_MODEL', 'qwen3-vl')
+        # Shared session keeps the HTTP connection alive across requests
+        self.session = requests.Session()
         
         # Test connection on initialization
         if not self.test_connection():
@@ -67,7 +69,7 @@ class OllamaService:
             if kwargs:
                 data["options"].update(kwargs)
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/generate",
                 json=data,
                 timeout=60  # 60 second timeout
@@ -146,7 +148,7 @@ class OllamaService:
             True if connection is successful, False otherwise
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=10)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=10)
             return response.status_code == 200
         except:
             return False
@@ -158,7 +160,7 @@ class OllamaService:
             List of model names
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=10)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 return [model["name"] for model in data.get("models", [])]
@@ -0,0 +1,39 @@
+"""
+TQQQ 狙击手策略信号内核
+
+把清仓 / 趋势 / 回调三组比较合并为一次 JIT 遍历，输出每根K线的信号码。
+仓位比例的累加仍留在策略中：清仓时是否重置取决于 broker 的实际持仓，无法预先算出。
+"""
+
+import numpy as np
+
+from utils._njit import njit
+
+SIGNAL_NONE = 0
+SIGNAL_EXIT = 1   # QQQ 跌破均线 * exit_buffer
+SIGNAL_ENTRY = 2  # QQQ 站上均线 * entry_buffer 且单日回调超过阈值
+
+
+@njit(cache=True)
+def tqqq_signals(close, sma, entry_buffer, exit_buffer, dip_threshold):
+    """
+    计算每根K线的信号码
+
+    参数:
+        close: QQQ 收盘价数组
+        sma: 与 close 对齐的均线数组，预热期为 NaN（比较恒为 False）
+        entry_buffer / exit_buffer / dip_threshold: 与策略参数同义
+
+    返回:
+        int8 数组，取值为 SIGNAL_NONE / SIGNAL_EXIT / SIGNAL_ENTRY
+    """
+    n = len(close)
+    out = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        price = close[i]
+        ma = sma[i]
+        if price < ma * exit_buffer:
+            out[i] = SIGNAL_EXIT
+        elif i > 0 and price > ma * entry_buffer and price < close[i - 1] * dip_threshold:
+            out[i] = SIGNAL_ENTRY
+    return out
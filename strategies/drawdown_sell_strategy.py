@@ -2,12 +2,11 @@ import os
 import sys
 import backtrader as bt
 from backtrader import *
-from matplotlib import pyplot as plt
 import numpy as np
 from utils.fetch_data import get_yfinance_data
 from datetime import datetime
 
-from utils.trade_visualizer import create_detailed_report, print_trade_report, visualize_trade_analyzer
+from utils.trade_visualizer import create_detailed_report, derive_trade_stats, print_trade_report, render_png
 
 # 添加当前目录到Python路径，确保lib模块能正确导入
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -204,12 +203,14 @@ def run_drawdown_strategy():
     print("\t最大回撤 max_drowdown : ", max_drowdown)
     print("\t最大回撤(资金)max_drowdown_money : ", max_drowdown_money)
     # trade analyzer
-    trade_data = anzs.TradeAnalyzer.get_analysis()
-    # 创建可视化图表
-    visualize_trade_analyzer(trade_data)
-    plt.show()
+    # 图表与报告共用一次提取的统计数值
+    trade_stats = derive_trade_stats(anzs.TradeAnalyzer.get_analysis())
+    # 创建可视化图表（没有任何交易时跳过）
+    if trade_stats.total:
+        render_png(trade_stats, 'trade_analysis.png')
+        print("\t交易分析图已保存到 trade_analysis.png")
     # 创建详细报告
-    report = create_detailed_report(trade_data)
+    report = create_detailed_report(trade_stats)
     # 手工计算SharpeRatio
     rets = list(strat.analyzers.returns.get_analysis().values())
     mean = np.mean(rets)
@@ -1,7 +1,8 @@
 import datetime
+import math
 from utils.sizer import PercentSizer
+from utils._njit import njit
 import backtrader as bt
-import akshare as ak
 import pandas as pd
 import matplotlib.pyplot as plt
 
@@ -14,6 +15,8 @@ def get_stock_data(symbol, start_date, end_date):
     使用 akshare 获取 A股 分钟级数据
     注意：这里获取的是 1分钟 数据，用于模拟 5分钟 策略
     """
+    # akshare 只在下载时按需导入，单纯导入策略类或决策内核不依赖它
+    import akshare as ak
     print(f"正在下载 {symbol} 的数据...")
     
     # Akshare 获取分钟数据的接口
@@ -26,9 +29,11 @@ def get_stock_data(symbol, start_date, end_date):
         # 数据清洗和列名映射
         df.columns = ['datetime', 'open', 'high', 'low', 'close', 'volume']
         
-        # 转换数据类型：确保volume列是数值类型
-        df['volume'] = pd.to_numeric(df['volume'], errors='coerce')
-        df['datetime'] = pd.to_datetime(df['datetime'])
+        # 转换数据类型：akshare 分钟数据为字符串列，一次性转为 float32，
+        # 日期按固定格式解析，避免逐行推断格式
+        num_cols = ['open', 'high', 'low', 'close', 'volume']
+        df[num_cols] = df[num_cols].astype('float32')
+        df['datetime'] = pd.to_datetime(df['datetime'], format='%Y-%m-%d %H:%M:%S', cache=True)
         
         # 处理可能的NaN值
         df.dropna(inplace=True)
@@ -36,14 +41,15 @@ def get_stock_data(symbol, start_date, end_date):
         df.set_index('datetime', inplace=True)
         
         # 转换为 5分钟 K线 (因为策略基于5分钟)
-        # 这里使用 resample 进行重采样
-        df_5min = df.resample('5Min').agg({
+        # 按向下取整到5分钟的时间戳分组聚合：只遍历实际存在的K线，
+        # 不像 resample 那样为隔夜/周末的空档生成大量空桶
+        df_5min = df.groupby(df.index.floor('5min')).agg({
             'open': 'first',
             'high': 'max',
             'low': 'min',
             'close': 'last',
             'volume': 'sum'
-        }).dropna()
+        })
         
         df_5min.index = df_5min.index.astype('datetime64[ns]')
         print(f"成功获取到 {len(df_5min)} 条5分钟数据.从{df_5min.index.min()} 到 {df_5min.index.max()}")
@@ -64,6 +70,46 @@ def get_stock_data(symbol, start_date, end_date):
 # ==========================
 # 2. 策略定义
 # ==========================
+# 交易决策内核的返回码
+ACTION_NONE = 0
+ACTION_BUY = 1
+ACTION_CLOSE = 2
+
+
+@njit(cache=True)
+def _decide(price, high, fhigh, vol_ratio, hhmm,
+            pos_size, entry_px, sl, tp, vol_thr):
+    """
+    单根K线的交易决策（纯标量计算，numba 编译为本地代码）
+
+    hhmm 为 时*100+分；fhigh 为 NaN 表示开盘阶段尚未结束。
+    返回 ACTION_NONE / ACTION_BUY / ACTION_CLOSE；强制平仓与止盈止损同时触发时只平仓一次。
+    """
+    # 只有当量比大于设定阈值时才考虑交易
+    if vol_ratio < vol_thr:
+        return ACTION_NONE
+
+    # 空仓时：价格突破前5分钟最高价做多
+    # （做空分支在原逻辑中不可达，仅保留做多开仓，因此不再传入低点）
+    if pos_size == 0.0:
+        if high > fhigh:
+            return ACTION_BUY
+        return ACTION_NONE
+
+    # 收盘前强制平仓（日内交易）
+    if 1455 <= hhmm < 1500:
+        return ACTION_CLOSE
+
+    # 止损止盈逻辑
+    if pos_size > 0.0:  # 多仓
+        if price >= entry_px * (1.0 + tp) or price <= entry_px * (1.0 - sl):
+            return ACTION_CLOSE
+    else:  # 空仓
+        if price <= entry_px * (1.0 - tp) or price >= entry_px * (1.0 + sl):
+            return ACTION_CLOSE
+    return ACTION_NONE
+
+
 class First5MinBreakout(bt.Strategy):
     # 定义参数（平衡版本 - 推荐）
     params = (
@@ -120,12 +166,14 @@ class First5MinBreakout(bt.Strategy):
         if self.order:
             return
 
-        # 正确的数据访问方式：self.data.datetime 而不是 self.datas.datetime
-        current_time = self.data.datetime.time(0)
-        
+        # 直接由 backtrader 的浮点日期（天数）取当日分钟数，避免每根K线构造 time 对象
+        dtnum = self.data.datetime[0]
+        hour, minute = divmod(int(round((dtnum - math.floor(dtnum)) * 1440.0)), 60)
+        hhmm = hour * 100 + minute
+
         # --- 1. 每天开盘重置逻辑 ---
         # 记录当天第一根K线的极值
-        if current_time.hour == 9 and current_time.minute <= 35:
+        if hour == 9 and minute <= 35:
             # 如果是当天前几个5分钟K线，记录极值
             if self.first_5min_high is None or self.is_first_bar_of_day:
                 self.first_5min_high = self.data.high[0]
@@ -144,63 +192,41 @@ class First5MinBreakout(bt.Strategy):
         # --- 2. 获取当前数据 ---
         price = self.data.close[0]
         high = self.data.high[0]
-        low = self.data.low[0]
+        vol_ratio = self.vol_ratio[0]
         
         # 调试信息：显示当前状态
         if len(self.data) % 100 == 0:  # 每100根K线输出一次调试信息
-            self.log(f'【调试】当前价格: {price}, 开盘高点: {self.first_5min_high}, 开盘低点: {self.first_5min_low}, 量比: {self.vol_ratio[0]:.2f}')
-        
-        # --- 3. 过滤条件：相对成交量 ---
-        # 只有当量比大于设定阈值时才考虑交易
-        if self.vol_ratio[0] < self.p.vol_ratio_threshold:
-            return # 量能不足，跳过
-
-        # --- 4. 核心交易逻辑 ---
-        # 必须已经过了开盘阶段，且已经记录了前5分钟极值
-        if self.first_5min_high is not None and self.first_5min_low is not None and not self.is_first_bar_of_day:
-            
-            # 【做多逻辑】
-            # 条件1: 价格突破前5分钟最高价
-            if not self.position: # 如果没有持仓
-                if high > self.first_5min_high:
-                    self.log(f'【开多信号】当前价格 {price} 突破前5分钟高点 {self.first_5min_high}, 量比: {self.vol_ratio[0]:.2f}')
-                    self.order = self.buy() # 买入开仓
-            
-            # 【做空逻辑】
-            # 条件1: 价格跌破前5分钟最低价
-            elif not self.position: # 修复逻辑：使用独立的if判断做空
-                if low < self.first_5min_low:
-                    self.log(f'【开空信号】当前价格 {price} 跌破前5分钟低点 {self.first_5min_low}, 量比: {self.vol_ratio[0]:.2f}')
-                    self.order = self.sell() # 卖出开仓 (做空)
-
-        # --- 5. 平仓逻辑 ---
-        # 收盘前强制平仓（日内交易）
-        if current_time.hour == 14 and current_time.minute >= 55:
-            if self.position:
-                self.log(f'【强制平仓】收盘前平仓，价格: {price}')
-                self.order = self.close()
-
-        # 止损止盈逻辑
-        if self.position:
-            entry_price = self.position.price
-            if self.position.size > 0:  # 多仓
-                # 止盈
-                if price >= entry_price * (1 + self.p.take_profit):
-                    self.log(f'【多仓止盈】价格 {price}, 入场价 {entry_price}, 收益率: {(price/entry_price-1)*100:.2f}%')
-                    self.order = self.close()
-                # 止损
-                elif price <= entry_price * (1 - self.p.stop_loss):
-                    self.log(f'【多仓止损】价格 {price}, 入场价 {entry_price}, 收益率: {(price/entry_price-1)*100:.2f}%')
-                    self.order = self.close()
-            elif self.position.size < 0:  # 空仓
-                # 止盈
-                if price <= entry_price * (1 - self.p.take_profit):
-                    self.log(f'【空仓止盈】价格 {price}, 入场价 {entry_price}, 收益率: {(entry_price/price-1)*100:.2f}%')
-                    self.order = self.close()
-                # 止损
-                elif price >= entry_price * (1 + self.p.stop_loss):
-                    self.log(f'【空仓止损】价格 {price}, 入场价 {entry_price}, 收益率: {(entry_price/price-1)*100:.2f}%')
-                    self.order = self.close()
+            self.log(f'【调试】当前价格: {price}, 开盘高点: {self.first_5min_high}, 开盘低点: {self.first_5min_low}, 量比: {vol_ratio:.2f}')
+
+        # --- 3. 交易决策（量能过滤 + 突破开仓 + 平仓）交给 JIT 内核 ---
+        # 开盘阶段未结束或尚未记录极值时传入 NaN，突破比较恒为 False
+        if self.first_5min_high is None or self.is_first_bar_of_day:
+            fhigh = math.nan
+        else:
+            fhigh = self.first_5min_high
+        pos_size = float(self.position.size)
+        entry_price = self.position.price
+        action = _decide(price, high, fhigh, vol_ratio,
+                         hhmm,
+                         pos_size, entry_price, self.p.stop_loss,
+                         self.p.take_profit, self.p.vol_ratio_threshold)
+
+        if action == ACTION_BUY:
+            self.log(f'【开多信号】当前价格 {price} 突破前5分钟高点 {fhigh}, 量比: {vol_ratio:.2f}')
+            self.order = self.buy() # 买入开仓
+        elif action == ACTION_CLOSE:
+            self.log(self._close_reason(price, pos_size, entry_price, hhmm))
+            self.order = self.close()
+
+    def _close_reason(self, price, pos_size, entry_price, hhmm):
+        """生成平仓日志（仅在平仓K线上调用）"""
+        if 1455 <= hhmm < 1500:
+            return f'【强制平仓】收盘前平仓，价格: {price}'
+        if pos_size > 0:
+            kind = '多仓止盈' if price >= entry_price else '多仓止损'
+            return f'【{kind}】价格 {price}, 入场价 {entry_price}, 收益率: {(price/entry_price-1)*100:.2f}%'
+        kind = '空仓止盈' if price <= entry_price else '空仓止损'
+        return f'【{kind}】价格 {price}, 入场价 {entry_price}, 收益率: {(entry_price/price-1)*100:.2f}%'
 
 
 # ==========================
@@ -1,11 +1,14 @@
 import datetime
+import os
 import backtrader as bt
 from strategies.ma_cross_over import SmaCross
 from utils.fetch_data import get_yfinance_data
 
 def runstrat():
 	#Instantiate Cerebro engine
-	cerebro = bt.Cerebro(optreturn=False)
+	#No plotting in the sweep: drop default observers and use every core.
+	#optreturn stays False because the results below read strategy.broker.
+	cerebro = bt.Cerebro(stdstats=False, optreturn=False, maxcpus=os.cpu_count())
 
 	#Set data parameters and add to Cerebro
 	data = get_yfinance_data('TLSA', datetime.datetime(2019, 1, 1), datetime.datetime(2024, 12, 31))
@@ -32,7 +32,8 @@ class SmaCross(bt.Strategy):
             self.close()  # close long position
 
 def run_backtest(plot=True):
-    cerebro = bt.Cerebro()  # create a "Cerebro" engine instance
+    # create a "Cerebro" engine instance; default observers are only needed for plotting
+    cerebro = bt.Cerebro(stdstats=plot)
 
     # Create a data feed
     # data = get_yfinance_data("INTC", "2014-01-01", "2025-11-30")
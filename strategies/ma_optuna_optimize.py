@@ -4,7 +4,7 @@ import backtrader as bt
 import optuna
 
 from strategies.ma_cross_over import SmaCross
-from utils.fetch_data import get_yfinance_data
+from utils.fetch_data import get_feed
 
 
 def objective(trial):
@@ -16,10 +16,12 @@ def objective(trial):
     if pfast >= pslow:
         return -1e6
 
-    cerebro = bt.Cerebro()
+    # 优化过程不绘图，关闭默认观察器减少每根K线的开销
+    cerebro = bt.Cerebro(stdstats=False)
     cerebro.addstrategy(SmaCross, pfast=pfast, pslow=pslow)
 
-    data = get_yfinance_data(
+    # 行情列数据在进程内只转换一次，每个试验仅新建轻量 feed，不再逐次解析 CSV
+    data = get_feed(
         'INTC',
         datetime.datetime(2014, 1, 1),
         datetime.datetime(2024, 12, 31)
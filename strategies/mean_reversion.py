@@ -1,9 +1,13 @@
 import backtrader as bt
+import numpy as np
 from utils.runer import run_strategy
 from utils.base_strategy import BaseStrategy
+from utils.indicators import IncrementalSMAStd
+from utils.rolling import rolling_mean_std
 
 class MeanReversionStrategy(BaseStrategy):
     params = (
+        ('period', 20),  # 均值/标准差窗口
         ('threshold', 2.0),  # 标准差阈值
         ('stop_loss_pct', 0.7),  # 止损比例4%
         ('take_profit_pct', 0.25),  # 止盈比例12%
@@ -12,49 +16,74 @@ class MeanReversionStrategy(BaseStrategy):
     
     def __init__(self):
         BaseStrategy.__init__(self)
-        self.sma = bt.ind.SMA(self.data.close, period=20)
-        self.std = bt.ind.StdDev(self.data.close, period=20)
-        self.zscore = (self.data.close - self.sma) / self.std
+        close = np.asarray(self.data.close.array, dtype=np.float64)
+        if len(close):
+            # 数据已预加载：一次性向量化计算整段 z-score，next() 中按下标读取
+            sma, std = rolling_mean_std(close, self.params.period)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self._z = (close - sma) / std
+        else:
+            # 未预加载（如 exactbars 模式）时退回逐根增量计算的指标
+            self._z = None
+            stats = IncrementalSMAStd(self.data.close, period=self.params.period)
+            self.zscore = (self.data.close - stats.sma) / stats.std
         self.stop_order = None
         self.take_profit_order = None
         self.trailing_stop_order = None
+        # 持仓方向：0=无仓位, 1=多头, -1=空头，只在订单成交时更新
+        self._state = 0
         
+    def notify_order(self, order):
+        BaseStrategy.notify_order(self, order)
+        if order.status in [order.Completed, order.Partial]:
+            size = self.position.size
+            self._state = (size > 0) - (size < 0)
+
     def next(self):
-        if not self.position:  # 无持仓
-            if self.zscore[0] > self.params.threshold:  # 超买，准备做空
-                self.sell()
-            elif self.zscore[0] < -self.params.threshold:  # 超卖，准备做多
-                self.buy()
+        # 预热期 z 为 NaN，所有比较均为 False，不会触发交易
+        z = self._z[len(self.data) - 1] if self._z is not None else self.zscore[0]
+        self._HANDLERS[self._state](self, z)
+
+    def _on_flat(self, z):
+        """无持仓"""
+        if z > self.params.threshold:  # 超买，准备做空
+            self.sell()
+        elif z < -self.params.threshold:  # 超卖，准备做多
+            self.buy()
+
+    def _on_long(self, z):
+        """持有多头"""
+        # 检查是否已经有止损止盈订单，如果没有则创建
+        if not self.stop_order and not self.take_profit_order:
+            entry_price = self.position.price
+            self.stop_order = self.sell(exectype=bt.Order.Stop, 
+                                      price=entry_price * (1 - self.params.stop_loss_pct))
+            self.take_profit_order = self.sell(exectype=bt.Order.Limit, 
+                                             price=entry_price * (1 + self.params.take_profit_pct))
+            self.trailing_stop_order = self.sell(exectype=bt.Order.StopTrail, 
+                                               trailamount=entry_price * self.params.trailing_stop_pct)
         
-        elif self.position.size > 0:  # 持有多头
-            # 检查是否已经有止损止盈订单，如果没有则创建
-            if not self.stop_order and not self.take_profit_order:
-                entry_price = self.position.price
-                self.stop_order = self.sell(exectype=bt.Order.Stop, 
-                                          price=entry_price * (1 - self.params.stop_loss_pct))
-                self.take_profit_order = self.sell(exectype=bt.Order.Limit, 
-                                                 price=entry_price * (1 + self.params.take_profit_pct))
-                self.trailing_stop_order = self.sell(exectype=bt.Order.StopTrail, 
-                                                   trailamount=entry_price * self.params.trailing_stop_pct)
-            
-            if self.zscore[0] > 0:  # 价格回归，准备反转
-                self.cancel_orders()
-                self.sell()  # FixedReverser会自动卖2倍
-                
-        elif self.position.size < 0:  # 持有空头
-            # 检查是否已经有止损止盈订单，如果没有则创建
-            if not self.stop_order and not self.take_profit_order:
-                entry_price = self.position.price
-                self.stop_order = self.buy(exectype=bt.Order.Stop, 
-                                         price=entry_price * (1 + self.params.stop_loss_pct))
-                self.take_profit_order = self.buy(exectype=bt.Order.Limit, 
-                                                price=entry_price * (1 - self.params.take_profit_pct))
-                self.trailing_stop_order = self.buy(exectype=bt.Order.StopTrail, 
-                                                  trailamount=entry_price * self.params.trailing_stop_pct)
-            
-            if self.zscore[0] < 0:  # 价格回归，准备反转
-                self.cancel_orders()
-                self.buy()  # FixedReverser会自动买2倍
+        if z > 0:  # 价格回归，准备反转
+            self.cancel_orders()
+            self.sell()  # FixedReverser会自动卖2倍
+
+    def _on_short(self, z):
+        """持有空头"""
+        # 检查是否已经有止损止盈订单，如果没有则创建
+        if not self.stop_order and not self.take_profit_order:
+            entry_price = self.position.price
+            self.stop_order = self.buy(exectype=bt.Order.Stop, 
+                                     price=entry_price * (1 + self.params.stop_loss_pct))
+            self.take_profit_order = self.buy(exectype=bt.Order.Limit, 
+                                            price=entry_price * (1 - self.params.take_profit_pct))
+            self.trailing_stop_order = self.buy(exectype=bt.Order.StopTrail, 
+                                              trailamount=entry_price * self.params.trailing_stop_pct)
+        
+        if z < 0:  # 价格回归，准备反转
+            self.cancel_orders()
+            self.buy()  # FixedReverser会自动买2倍
+
+    _HANDLERS = {0: _on_flat, 1: _on_long, -1: _on_short}
 
     def cancel_orders(self):
         """取消所有待处理的订单"""
@@ -2,8 +2,27 @@
 import argparse
 import datetime
 import backtrader as bt
-import backtrader.indicators as btind
+import numpy as np
 from utils.fetch_data import get_yfinance_data
+from utils.indicators import IncrementalOLSTransform, IncrementalSMAStd
+from utils._pair_njit import rolling_pair_zscore
+
+# 原先的 OLS_TransformationN 内部构造 OLS_Slope_InterceptN 时未透传 period，
+# 实际回归窗口为后者的默认值，沿用以保持信号不变
+OLS_PERIOD = 10
+
+# 每根K线的 z-score 信号位，可同时置位；是否执行还取决于当前持仓状态
+SIGNAL_CLOSE = 1  # |z| < zexit
+SIGNAL_SHORT = 2  # z > zentry
+SIGNAL_LONG = 4   # z < -zentry
+
+
+def encode_signals(z, zentry, zexit):
+    """把 z-score（标量或数组）编码为信号位，NaN 不产生任何信号"""
+    return ((np.abs(z) < zexit) * SIGNAL_CLOSE
+            | (z > zentry) * SIGNAL_SHORT
+            | (z < -zentry) * SIGNAL_LONG)
+
 
 class SafePairTradingStrategy(bt.Strategy):
     params = dict(
@@ -21,24 +40,47 @@ class SafePairTradingStrategy(bt.Strategy):
             print(f'{dt.isoformat()}, {txt}')
 
     def __init__(self):
-        # OLS 计算残差
-        self.ols = btind.OLS_TransformationN(self.data0, self.data1, period=self.p.period)
-        spread = self.data0.close - self.ols
-        self.zscore = (spread - btind.SMA(spread, period=self.p.period)) / btind.StdDev(spread, period=self.p.period)
+        c0 = np.asarray(self.data0.close.array, dtype=np.float64)
+        c1 = np.asarray(self.data1.close.array, dtype=np.float64)
+        if len(c0) and list(self.data0.datetime.array) == list(self.data1.datetime.array):
+            # 数据已预加载且两条腿日期对齐：单次遍历计算整段 z-score
+            self._z = rolling_pair_zscore(c0, c1, OLS_PERIOD, self.p.period)
+            with np.errstate(invalid='ignore'):
+                self._signals = encode_signals(self._z, self.p.zentry, self.p.zexit).astype(np.int8)
+        else:
+            # 未预加载或日期不对齐时退回逐根计算的指标
+            self._z = None
+            # OLS 计算残差
+            self.ols = IncrementalOLSTransform(self.data0.close, self.data1.close, period=OLS_PERIOD)
+            spread = self.data0.close - self.ols
+            stats = IncrementalSMAStd(spread, period=self.p.period)
+            self.zscore = (spread - stats.sma) / stats.std
 
         # 当前持仓状态: 0=无仓位, 1=short spread, 2=long spread
         self.status = 0
 
-    def next(self):
-        z = self.zscore[0]
-
+    def _leg_sizes(self):
+        """只在开仓时调用：按当前账户净值计算两条腿各自的下单股数"""
         # 获取当前账户净值，计算每条腿可分配资金
         cash = self.broker.getvalue() * 0.5
         size0 = max(int(cash / self.data0.close[0]), self.p.stake)
         size1 = max(int(cash / self.data1.close[0]), self.p.stake)
+        return size0, size1
+
+    def next(self):
+        # 预热期 z 为 NaN，不产生任何信号
+        if self._z is not None:
+            i = len(self.data0) - 1
+            z = self._z[i]
+            signals = self._signals[i]
+        else:
+            z = self.zscore[0]
+            signals = encode_signals(z, self.p.zentry, self.p.zexit)
+        if not signals:
+            return
 
         # 平仓逻辑
-        if self.status != 0 and abs(z) < self.p.zexit:
+        if self.status != 0 and signals & SIGNAL_CLOSE:
             self.log(f'CLOSE POSITION, zscore={z:.2f}')
             self.close(data=self.data0)
             self.close(data=self.data1)
@@ -46,15 +88,17 @@ class SafePairTradingStrategy(bt.Strategy):
             return
 
         # 开仓逻辑
-        if z > self.p.zentry and self.status != 1:
+        if signals & SIGNAL_SHORT and self.status != 1:
             # short spread: sell data0, buy data1
+            size0, size1 = self._leg_sizes()
             self.log(f'SHORT SPREAD, zscore={z:.2f}, SELL {size0} of {self.data0._name}, BUY {size1} of {self.data1._name}')
             self.sell(data=self.data0, size=size0)
             self.buy(data=self.data1, size=size1)
             self.status = 1
 
-        elif z < -self.p.zentry and self.status != 2:
+        elif signals & SIGNAL_LONG and self.status != 2:
             # long spread: buy data0, sell data1
+            size0, size1 = self._leg_sizes()
             self.log(f'LONG SPREAD, zscore={z:.2f}, BUY {size0} of {self.data0._name}, SELL {size1} of {self.data1._name}')
             self.buy(data=self.data0, size=size0)
             self.sell(data=self.data1, size=size1)
@@ -73,7 +117,8 @@ def run_strategy(stock0='PEP', stock1='KO',
                  fromdate='2014-01-01', todate='2024-12-31',
                  cash=10000, comm=0.005, plot=False):
 
-    cerebro = bt.Cerebro()
+    # 策略在 __init__ 中基于预加载的整段行情预计算信号，需保持 preload/runonce 开启
+    cerebro = bt.Cerebro(preload=True, runonce=True)
     cerebro.broker.setcash(cash)
     cerebro.broker.setcommission(commission=comm)
 
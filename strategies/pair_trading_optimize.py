@@ -1,29 +1,113 @@
 import datetime
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 import backtrader as bt
+import numpy as np
 import optuna
+from optuna.storages.journal import JournalFileBackend
 
 from strategies.pair_trading import SafePairTradingStrategy
-from utils.fetch_data import get_yfinance_data
+from utils.fetch_data import ArrayFeed, cached_fetch, frame_columns
 
 STOCK0 = 'NVDA'
 STOCK1 = 'AMD'
+FROMDATE = datetime.datetime(2014, 1, 1)
+TODATE = datetime.datetime(2024, 12, 31)
+N_TRIALS = 50
+STORAGE_PATH = 'study.log'
 
-def objective(trial):
+# 工作进程内的行情列数据，由 _init_worker 在进程启动时转换一次
+_DATA0_COLS = None
+_DATA1_COLS = None
+
+
+class PruningReporter(bt.Analyzer):
+    """
+    每跨过一个自然年向 Optuna 汇报截至当前的年化夏普比率，
+    落后于已完成试验中位数的试验直接中止回测，不再跑完剩余年份
+    """
+
+    params = (
+        ('trial', None),
+        ('riskfree', 0.01),
+        ('factor', 252),
+    )
+
+    def start(self):
+        self._prev_value = self.strategy.broker.getvalue()
+        self._returns = []
+        self._year = None
+        self._step = 0
+
+    def next(self):
+        year = self.strategy.datetime.date(0).year
+        if self._year is not None and year != self._year:
+            self._report()
+        self._year = year
+
+        value = self.strategy.broker.getvalue()
+        self._returns.append(value / self._prev_value - 1.0)
+        self._prev_value = value
+
+    def _report(self):
+        # 与 SharpeRatio 分析器同口径：日收益减去日化无风险利率，总体标准差
+        rate = (1.0 + self.p.riskfree) ** (1.0 / self.p.factor) - 1.0
+        excess = np.asarray(self._returns) - rate
+        std = excess.std()
+        sharpe = np.sqrt(self.p.factor) * excess.mean() / std if std > 0 else 0.0
+
+        trial = self.p.trial
+        trial.report(float(sharpe), step=self._step)
+        self._step += 1
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+
+
+def load_data():
+    """主进程中只加载一次两条腿的行情 DataFrame"""
+    data0_df = cached_fetch(STOCK0, FROMDATE, TODATE, return_df=True)
+    data1_df = cached_fetch(STOCK1, FROMDATE, TODATE, return_df=True)
+    return data0_df, data1_df
+
+
+def _init_worker(data0_df, data1_df):
+    global _DATA0_COLS, _DATA1_COLS
+    _DATA0_COLS, _DATA1_COLS = frame_columns(data0_df), frame_columns(data1_df)
+
+
+def _storage():
+    # 追加写入的日志文件存储，多进程并发写入无需数据库锁
+    return optuna.storages.JournalStorage(JournalFileBackend(STORAGE_PATH))
+
+
+def _pruner():
+    # 中位数剪枝：前 5 个试验完整跑完作为基准，之后按年度夏普比率提前淘汰
+    return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1)
+
+
+def _run_worker(study_name, n_trials):
+    # 各进程通过同一个日志文件存储共享试验状态；剪枝器不随存储持久化，需在进程内重新指定
+    study = optuna.load_study(study_name=study_name, storage=_storage(), pruner=_pruner())
+    study.optimize(lambda trial: objective(trial, _DATA0_COLS, _DATA1_COLS), n_trials=n_trials)
+
+
+def objective(trial, data0_cols, data1_cols):
     # z-score 阈值参数优化
     zentry = trial.suggest_float('zentry', 1.5, 3.0)
     zexit = trial.suggest_float('zexit', 0.0, 1.0)
     period = trial.suggest_int('period', 5, 30)
 
-    cerebro = bt.Cerebro()
+    # 优化过程不绘图，关闭默认观察器；策略依赖预加载行情预计算信号，保持 preload/runonce 开启
+    cerebro = bt.Cerebro(stdstats=False, preload=True, runonce=True)
     cerebro.broker.setcash(10000)
     
-    # 获取数据
-    data0 = get_yfinance_data(STOCK0, datetime.datetime(2014,1,1), datetime.datetime(2024,12,31))
+    # backtrader 会修改 feed 的内部状态，每次试验都基于预先转换的列数据新建 feed
+    data0 = ArrayFeed(columns=data0_cols)
     data0._name = STOCK0
     cerebro.adddata(data0)
 
-    data1 = get_yfinance_data(STOCK1, datetime.datetime(2014,1,1), datetime.datetime(2024,12,31))
+    data1 = ArrayFeed(columns=data1_cols)
     data1._name = STOCK1
     cerebro.adddata(data1)
 
@@ -32,6 +116,7 @@ def objective(trial):
 
     # 添加分析器
     cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe', timeframe=bt.TimeFrame.Days, annualize=True)
+    cerebro.addanalyzer(PruningReporter, trial=trial)
 
     try:
         result = cerebro.run()
@@ -39,14 +124,31 @@ def objective(trial):
         if sharpe is None:
             return -1e6
         return float(sharpe)
+    except optuna.TrialPruned:
+        raise
     except Exception as e:
         print("回测异常:", e)
         return -1e6
 
 if __name__ == '__main__':
     start_time = time.time()
-    study = optuna.create_study(direction='maximize')
-    study.optimize(objective, n_trials=50, n_jobs=1)  # n_jobs>1可能出问题
+    data0_df, data1_df = load_data()
+
+    # 名称只由标的决定：再次运行时从日志文件中载入同名研究，在已有试验基础上继续追加 N_TRIALS 次
+    study_name = f'pair_trading_{STOCK0}_{STOCK1}'
+    study = optuna.create_study(direction='maximize', study_name=study_name,
+                                storage=_storage(), load_if_exists=True, pruner=_pruner())
+
+    # 多进程并行试验：线程级 n_jobs 受 GIL 限制，每个进程独立跑一部分试验
+    n_workers = min(os.cpu_count() or 1, N_TRIALS)
+    trials_per_worker = [N_TRIALS // n_workers + (i < N_TRIALS % n_workers) for i in range(n_workers)]
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(data0_df, data1_df)) as executor:
+        futures = [executor.submit(_run_worker, study_name, n) for n in trials_per_worker]
+        for future in futures:
+            future.result()
+
+    study = optuna.load_study(study_name=study_name, storage=_storage())
 
     end_time = time.time()
     print(f"优化耗时: {(end_time - start_time)/60:.2f} 分钟")
@@ -1,5 +1,6 @@
 import os
 import backtrader as bt
+import numpy as np
 from datetime import datetime
 import sys
 from utils.sizer import PercentSizer
@@ -10,6 +11,7 @@ from llm_advisory.advisors import (
     BacktraderTechnicalAnalysisAdvisor
 )
 from utils.fetch_data import get_yfinance_data
+from utils.rolling import rolling_mean
 
 class SingleMovingAvgStrategy(bt.Strategy):
     """单均线示例策略"""
@@ -28,13 +30,22 @@ class SingleMovingAvgStrategy(bt.Strategy):
     def __init__(self):
         # 基本指标
         self.dataclose = self.datas[0].close
-        self.sma = bt.indicators.SimpleMovingAverage(self.datas[0], period=self.params.short_ma_period)
+        close = np.asarray(self.dataclose.array, dtype=np.float64)
+        if len(close):
+            # 数据已预加载：一次性计算整段均线，next() 中按下标读取
+            self._sma = rolling_mean(close, self.params.short_ma_period)
+        else:
+            self._sma = None
+            self.sma = bt.indicators.SimpleMovingAverage(self.datas[0], period=self.params.short_ma_period)
         
         self.order = None
         
         # 交易计数器
         self.trade_count = 0
-        
+
+        # 已处理的K线数，与 len(self) 一致但省去每根K线的 __len__ 调用
+        self._bar = 0
+
     def notify_order(self, order):
         """订单处理"""
         if order.status in [order.Completed]:
@@ -45,25 +56,32 @@ class SingleMovingAvgStrategy(bt.Strategy):
             self.trade_count += 1
         self.order = None
     
+    def prenext(self):
+        self._bar += 1
+
     def next(self):
         """交易逻辑"""
+        self._bar += 1
+        sma = self._sma[self._bar - 1] if self._sma is not None else self.sma[0]
+        if sma != sma:  # 均线预热期
+            return
         if self.order:
             return
         
         # 基础交易逻辑（不依赖LLM，用于演示）
         if not self.position:
-            if self.dataclose[0] > self.sma[0]:
+            if self.dataclose[0] > sma:
                 self.order = self.buy()
                 self.log(f"基于基础策略买入 - 价格: {self.dataclose[0]:.2f}")
         else:
-            if self.dataclose[0] < self.sma[0]:
+            if self.dataclose[0] < sma:
                 self.order = self.sell()
                 self.log(f"基于基础策略卖出 - 价格: {self.dataclose[0]:.2f}")
         
-        # 演示：记录一些基本指标状态（模拟LLM分析）
-        if len(self) % 10 == 0:  # 每10个bar记录一次
-            trend_status = "上升" if self.dataclose[0] > self.sma[0] else "下降"
-            self.log(f"趋势状态: {trend_status}, 价格: {self.dataclose[0]:.2f}, SMA: {self.sma[0]:.2f}")
+        # 演示：记录一些基本指标状态（模拟LLM分析），关闭日志时整段跳过
+        if self.params.print_log and self._bar % 10 == 0:  # 每10个bar记录一次
+            trend_status = "上升" if self.dataclose[0] > sma else "下降"
+            self.log(f"趋势状态: {trend_status}, 价格: {self.dataclose[0]:.2f}, SMA: {sma:.2f}")
     
     def stop(self):
         """结束时的统计"""
@@ -74,7 +92,8 @@ def demo_llm_advisory():
     """演示LLM Advisory基本用法"""
     print("=== LLM Advisory 基础演示 ===")
     
-    cerebro = bt.Cerebro()
+    # 策略在 __init__ 中基于预加载的整段行情预计算信号，需保持 preload/runonce 开启
+    cerebro = bt.Cerebro(preload=True, runonce=True)
     init_cash = 10000.0
 
     # 基本设置
@@ -1,15 +1,21 @@
 import argparse
-from datetime import datetime
+import functools
+import heapq
 import sys
 import os
 import time
-import optuna
+from concurrent.futures import ProcessPoolExecutor
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.fetch_data import get_yfinance_data
+from utils.fetch_data import cached_fetch
 
 import backtrader as bt
+import numpy as np
 from utils.base_strategy import BaseStrategy
+from utils.rolling import rolling_mean
 from utils.runer import run_strategy
+from strategies._tqqq_njit import tqqq_signals, SIGNAL_NONE, SIGNAL_EXIT, SIGNAL_ENTRY
+from strategies.tqqq_vectorized import (align_prices, build_signals, _simulate, sharpe_ratios,
+                                        max_drawdowns, annual_returns, warmup_kernels)
 
 """
 TQQQ 狙击手策略 - 多目标优化版本
@@ -41,126 +47,216 @@ class TQQQSniperStrategy(BaseStrategy):
         self.qqq = self.datas[0]
         self.tqqq = self.datas[1]
         
-        # 计算 QQQ 的 200日均线 [1]
-        self.sma = bt.indicators.SimpleMovingAverage(self.qqq.close, period=self.params.ma_period)
+        close = np.asarray(self.qqq.close.array, dtype=np.float64)
+        if len(close):
+            # 数据已预加载：一次性算出整段的信号码，next() 中按下标读取
+            # 计算 QQQ 的 200日均线 [1]
+            sma = rolling_mean(close, self.params.ma_period)
+            self._signals = tqqq_signals(close, sma, self.params.entry_buffer,
+                                         self.params.exit_buffer, self.params.dip_threshold)
+            # 下单价同样按下标读取，避免 LineBuffer 的 close[0] 取值开销
+            self._tqqq_close = np.asarray(self.tqqq.close.array, dtype=np.float64)
+        else:
+            # 未预加载时退回逐根计算的指标
+            self._signals = None
+            self._tqqq_close = None
+            # 上一根K线收盘价 * dip_threshold，逐根滚动更新，免去每根K线读取 close[-1]
+            self._dip_trigger = None
+            self.sma = bt.indicators.SimpleMovingAverage(self.qqq.close, period=self.params.ma_period)
         
         # 用于记录当前 TQQQ 的建仓进度
         self.current_pos_ratio = 0.0
 
-    def next(self):
+    def _signal(self):
+        """返回当前K线的信号码"""
+        if self._signals is not None:
+            return self._signals[len(self.qqq) - 1]
+
         # 获取当前 QQQ 价格和均线值
-        qqq_price = self.qqq.close
-        ma_val = self.sma
-        
+        qqq_price = self.qqq.close[0]
+        ma_val = self.sma[0]
+        dip_trigger = self._dip_trigger
+        if dip_trigger is None:
+            dip_trigger = self.qqq.close[-1] * self.params.dip_threshold
+        self._dip_trigger = qqq_price * self.params.dip_threshold
+
+        if qqq_price < ma_val * self.params.exit_buffer:
+            return SIGNAL_EXIT
+        if qqq_price > ma_val * self.params.entry_buffer and qqq_price < dip_trigger:
+            return SIGNAL_ENTRY
+        return SIGNAL_NONE
+
+    def next(self):
+        # 均线预热期内无信号
+        signal = self._signal()
+
         # --- 防御清仓逻辑 ---
         # 只要 QQQ 价格跌破 200MA 再减 3% 的缓冲区，立即 100% 卖出 [1]
-        if qqq_price < ma_val * self.params.exit_buffer:
+        if signal == SIGNAL_EXIT:
             if self.getposition(self.tqqq).size > 0:
-                print(f"清仓信号：现金{self.broker.getcash():.2f}")
                 self.close(data=self.tqqq)
                 self.current_pos_ratio = 0.0
-                print(f"清仓信号：QQQ跌破均线安全区，全仓撤退至现金{self.broker.getcash():.2f}")
+                # 日志参数延迟格式化，关闭日志时不拼接字符串
+                self.log("清仓信号：QQQ跌破均线安全区，全仓撤退至现金%.2f", self.broker.getcash())
             return
 
         # --- 狙击买入逻辑 ---
         # 条件1：趋势要强（QQQ > 200MA + 4%）[1]
-        trend_is_strong = qqq_price > ma_val * self.params.entry_buffer
-        
         # 条件2：时机要准（单日回调超过 1%）[1]
-        is_dip = qqq_price < self.qqq.close[-1] * self.params.dip_threshold
-        
-        if trend_is_strong and is_dip:
+        if signal == SIGNAL_ENTRY:
             # 如果还没建满仓（分 5 笔，每笔 20%）[1, 2]
             if self.current_pos_ratio < self.params.max_pos_pct:
                 # 计算目标仓位，确保不超过1.0
                 target = min(self.current_pos_ratio + self.params.batch_size, self.params.max_pos_pct)
                 # 计算目标仓位对应的股数（仅针对分配给此策略的资金）
                 # 注意：来源建议此策略占总资产的 25% [6]
-                self.order_target_percent(data=self.tqqq, target=target)
+                self._order_to_target(target)
                 self.current_pos_ratio = target
-                print(f"买入信号：趋势走强且回调，加仓 {self.params.batch_size*100:.1f}%，当前仓位: {self.current_pos_ratio*100:.1f}% [1]")
+                self.log("买入信号：趋势走强且回调，加仓 %.1f%%，当前仓位: %.1f%% [1]",
+                         self.params.batch_size * 100, self.current_pos_ratio * 100)
                 
-def run_tqqq_strategy(strategy_args={}, symbol=['QQQ', 'TQQQ'], start_date='2010-01-01', end_date='2025-06-30'):
-    # 运行策略
-    cerebro = run_strategy(TQQQSniperStrategy, strategy_args=strategy_args, symbol=symbol, start_date=start_date, end_date=end_date)
-    cerebro.plot()
+    def _order_to_target(self, target):
+        """
+        按目标仓位比例直接下单，股数算法与 order_target_percent 一致，
+        但只做一次账户估值，持仓市值由持仓股数直接换算
+        """
+        if self._tqqq_close is not None:
+            price = self._tqqq_close[len(self.tqqq) - 1]
+        else:
+            price = self.tqqq.close[0]
+        comminfo = self.broker.getcommissioninfo(self.tqqq)
+        target_value = self.broker.getvalue() * target
+        pos_value = comminfo.getvaluesize(self.getposition(self.tqqq).size, price)
+        if target_value > pos_value:
+            self.buy(data=self.tqqq, size=comminfo.getsize(price, target_value - pos_value), price=price)
+        elif target_value < pos_value:
+            self.sell(data=self.tqqq, size=comminfo.getsize(price, pos_value - target_value), price=price)
+
+def run_tqqq_strategy(strategy_args={}, symbol=['QQQ', 'TQQQ'], start_date='2010-01-01', end_date='2025-06-30',
+                      plot=True):
+    # 运行策略，不绘图时关闭默认观察器
+    cerebro = run_strategy(TQQQSniperStrategy, strategy_args=strategy_args, symbol=symbol, start_date=start_date,
+                           end_date=end_date, stdstats=plot)
+    if plot:
+        cerebro.plot()
     return cerebro
 
 
 
-def objective(trial, args):
+N_TRIALS = 100
+STORAGE_PATH = 'tqqq_study.log'
+
+# 工作进程内的行情数组，由 _init_worker 在进程启动时设置一次
+_PRICES = None
+
+
+def _init_worker(prices):
+    global _PRICES
+    _PRICES = prices
+
+
+def _storage():
+    # optuna 只在优化路径中按需导入，单纯导入策略类或回测时不付出其导入开销
+    import optuna
+    from optuna.storages.journal import JournalFileBackend
+    # 追加写入的日志文件存储，多进程并发写入无需数据库锁
+    return optuna.storages.JournalStorage(JournalFileBackend(STORAGE_PATH))
+
+
+def _sampler():
+    import optuna
+    # 多元 TPE 建模参数间的相关性；constant_liar 让并行进程避开其他进程正在评估的区域
+    return optuna.samplers.TPESampler(multivariate=True, constant_liar=True)
+
+
+def _run_worker(study_name, n_trials):
+    import optuna
+    # 各进程通过同一个日志文件存储共享试验状态；采样器不随存储持久化，需在进程内重新指定
+    study = optuna.load_study(study_name=study_name, storage=_storage(), sampler=_sampler())
+    study.optimize(make_objective(_PRICES), n_trials=n_trials)
+
+
+def _load_prices(args):
+    """加载并按日期对齐参照物与交易标的行情（磁盘缓存见 cached_fetch）"""
+    qqq_df = cached_fetch(args.stock0, args.fromdate, args.todate, return_df=True)
+    tqqq_df = cached_fetch(args.stock1, args.fromdate, args.todate, return_df=True)
+    return align_prices(qqq_df, tqqq_df)
+
+
+def _vector_backtest(prices, params, cash=10000, max_pos_pct=0.95):
+    """
+    单组参数的向量化回测，成交规则与 TQQQSniperStrategy 在默认 broker 下一致
+
+    参数:
+        prices (tuple): align_prices 返回的 (日期, QQQ 收盘, TQQQ 开盘, TQQQ 收盘)
+        params (dict): 策略参数
+        cash (float): 初始资金
+        max_pos_pct (float): 最大仓位
+
+    返回:
+        dict: sharpe / avg_annual_return / final_value / max_drawdown / total_trades
+    """
+    dates, close, t_open, t_close = prices
+    # build_signals / _simulate 按参数组矩阵计算，单组参数即一列
+    cols = {name: np.array([value]) for name, value in params.items()}
+    exit_mat, entry_mat = build_signals(close, cols)
+    values, trades = _simulate(exit_mat, entry_mat, t_open, t_close,
+                               cols['batch_size'].astype(np.float64),
+                               float(max_pos_pct), float(cash))
+    return {
+        'sharpe': float(sharpe_ratios(values, float(cash))[0]),
+        'avg_annual_return': float(annual_returns(values, dates, float(cash))[:, 0].mean()),
+        'final_value': float(values[-1, 0]),
+        'max_drawdown': float(max_drawdowns(values)[0]),
+        'total_trades': int(trades[0]),
+    }
+
+
+def make_objective(prices):
+    """
+    绑定行情数组的目标函数，供 study.optimize 直接调用
+
+    partial 只携带已加载的数组，不依赖模块级 args，可被 pickle 传给工作进程
+    """
+    return functools.partial(objective, prices=prices)
+
+
+def objective(trial, prices):
     # ✅ TQQQ Sniper 策略参数优化
     # 均线周期
     ma_period = trial.suggest_int('ma_period', 66, 300)  # 100-300日均线范围
     
     # 入场缓冲比例 (1.01-1.10 = 1%-10%)
-    entry_buffer = trial.suggest_float('entry_buffer', 1.01, 1.10)
-    
     # 出场缓冲比例 (0.90-0.99 = 1%-10% 下跌)
+    # 两个区间互不重叠，入场缓冲恒大于 1 且大于出场缓冲，每个试验都满足约束，无需事后剔除
+    entry_buffer = trial.suggest_float('entry_buffer', 1.01, 1.10)
     exit_buffer = trial.suggest_float('exit_buffer', 0.90, 0.99)
     
     # 回调阈值 (0.95-0.995 = 0.5%-5% 回调)
     dip_threshold = trial.suggest_float('dip_threshold', 0.95, 0.995)
     # 批次大小 (0.1-0.3 = 10%-30% 仓位)
     batch_size = trial.suggest_float('batch_size', 0.1, 0.5)
-    
-    # 参数约束：入场缓冲必须大于出场缓冲
-    if entry_buffer <= exit_buffer:
-        return 0
-    
-    # 参数约束：入场缓冲必须大于1，出场缓冲必须小于1
-    if entry_buffer <= 1.0 or exit_buffer >= 1.0:
-        return 0
-
-    cerebro = bt.Cerebro()
-    cerebro.addstrategy(TQQQSniperStrategy, 
-                      ma_period=ma_period,
-                      entry_buffer=entry_buffer,
-                      exit_buffer=exit_buffer,
-                      dip_threshold=dip_threshold,
-                      batch_size=batch_size)
-
-    # 使用 QQQ 作为参照物，TQQQ 作为交易标的
-    qqq_data = get_yfinance_data(
-        args.stock0,
-        args.fromdate,
-        args.todate
-    )
-    tqqq_data = get_yfinance_data(
-        args.stock1,
-        args.fromdate,
-        args.todate
-    )
-    
-    cerebro.adddata(qqq_data)
-    cerebro.adddata(tqqq_data)
-
-    cerebro.broker.setcash(10000)
-
-    # 添加多个性能指标
-    cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe', timeframe=bt.TimeFrame.Days, annualize=True)
-    cerebro.addanalyzer(bt.analyzers.AnnualReturn, _name='returns')
-    cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
-    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
 
     try:
-        strats = cerebro.run()
-        strat = strats[0]
-        
-        # 获取各项指标
-        sharpe_ratio = strat.analyzers.sharpe.get_analysis().get('sharperatio', 0)
-        returns_analysis = strat.analyzers.returns.get_analysis()
-        annual_return = returns_analysis.get('rnorm100', 0)  # 年化收益率百分比
-        
-        trades_analysis = strat.analyzers.trades.get_analysis()
-        total_trades = trades_analysis.get('total', {}).get('total', 0)
-        print("总交易次数:", total_trades)
-        win_rate = trades_analysis.get('won', {}).get('total', 0) / max(total_trades, 1)
-        drawdown = strat.analyzers.drawdown.get_analysis()
-        max_drawdown = drawdown.get('max', {}).get('drawdown', 100)  # 最大回撤
-        # 处理缺失值
-        sharpe_ratio = sharpe_ratio if sharpe_ratio is not None else -2
-        annual_return = annual_return if annual_return is not None else -100
+        metrics = _vector_backtest(prices, {
+            'ma_period': ma_period,
+            'entry_buffer': entry_buffer,
+            'exit_buffer': exit_buffer,
+            'dip_threshold': dip_threshold,
+            'batch_size': batch_size,
+        }, cash=10000)
+
+        sharpe_ratio = metrics['sharpe']
+        total_trades = metrics['total_trades']
+        # 处理缺失值（净值无波动时夏普比率无定义）
+        sharpe_ratio = sharpe_ratio if np.isfinite(sharpe_ratio) else -2
+
+        # 记录展示用的详细指标，优化结束后直接从最佳试验读取
+        trial.set_user_attr('sharpe', float(sharpe_ratio))
+        trial.set_user_attr('avg_annual_return', metrics['avg_annual_return'])
+        trial.set_user_attr('final_value', metrics['final_value'])
+        trial.set_user_attr('max_drawdown', metrics['max_drawdown'])
+        trial.set_user_attr('total_trades', total_trades)
         
         # 如果夏普比率为None，返回一个较差的值
         # # 设置约束条件（硬性要求）: 最大回撤超过30%，直接淘汰
@@ -176,16 +272,34 @@ def objective(trial, args):
         return -1e6
 
 
-def optimize_strategy():
+def optimize_strategy(args):
     """
     python  strategies\tqqq_sniper.py -s0 UNG -s1 UGAZ --fromdate 2010-01-01 --todate 2025-12-31 --cash 10000 --commperc 0.005 
     """
+    import optuna
     start_time = time.time()
-    study = optuna.create_study(direction='maximize')
+    # 名称只由标的决定：再次运行时从日志文件中载入同名研究，在已有试验基础上继续追加 N_TRIALS 次
+    study_name = f'tqqq_sniper_{args.stock0}_{args.stock1}'
+    study = optuna.create_study(direction='maximize', study_name=study_name, sampler=_sampler(),
+                                storage=_storage(), load_if_exists=True)
     print("开始 TQQQ Sniper 策略多目标优化（夏普比率 + 平均年化收益率）...")
     print("优化目标权重：夏普比率 60%，年化收益率 40%")
     
-    study.optimize(lambda trial: objective(trial, args), n_trials=100, n_jobs=6)  # 减少试次数，提高稳定性
+    # 行情在优化开始前只加载一次，所有试验共享同一组数组
+    prices = _load_prices(args)
+    # 在主进程预先完成 JIT 编译（并写入磁盘缓存），工作进程无需各自重复编译
+    warmup_kernels()
+
+    # 多进程并行试验：线程级 n_jobs 受 GIL 限制，每个进程独立跑一部分试验
+    n_workers = min(os.cpu_count() or 1, N_TRIALS)
+    trials_per_worker = [N_TRIALS // n_workers + (i < N_TRIALS % n_workers) for i in range(n_workers)]
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(prices,)) as executor:
+        futures = [executor.submit(_run_worker, study_name, n) for n in trials_per_worker]
+        for future in futures:
+            future.result()
+
+    study = optuna.load_study(study_name=study_name, storage=_storage())
 
     end_time = time.time()
     print(f"优化耗时: {(end_time - start_time)/60:.2f} 分钟")
@@ -203,6 +317,7 @@ def _display_optimization_results(study):
     返回:
         无
     """
+    import optuna
     print("\n=== TQQQ Sniper 策略优化结果 ===")
     print("最优参数:", study.best_params)
     print("最优组合得分（夏普比率）:", study.best_value)
@@ -219,73 +334,24 @@ def _display_optimization_results(study):
     
     # 显示最佳试验的详细指标
     print(f"\n最佳试验详细指标:")
-    # 运行一次最佳参数获取详细指标
-    from copy import deepcopy
-    best_params = deepcopy(study.best_params)
-    
-    # 创建一个临时函数来获取详细指标
-    def get_detailed_metrics(params):
-        cerebro = bt.Cerebro()
-        cerebro.addstrategy(TQQQSniperStrategy, **params)
-
-        # 使用 QQQ 作为参照物，TQQQ 作为交易标的
-        qqq_data = get_yfinance_data(
-            args.stock0,
-            datetime(2014, 1, 1),
-            datetime(2024, 12, 31)
-        )
-        tqqq_data = get_yfinance_data(
-            args.stock1,
-            datetime(2014, 1, 1),
-            datetime(2024, 12, 31)
-        )
-        
-        cerebro.adddata(qqq_data)
-        cerebro.adddata(tqqq_data)
-        cerebro.broker.setcash(10000)
-
-        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe', timeframe=bt.TimeFrame.Days, annualize=True)
-        cerebro.addanalyzer(bt.analyzers.AnnualReturn, _name='annual_return')
-        cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
-        cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
-
-        result = cerebro.run()
-        
-        sharpe = result[0].analyzers.sharpe.get_analysis().get('sharperatio', 0)
-        annual_return_data = result[0].analyzers.annual_return.get_analysis()
-        avg_annual_return = sum(annual_return_data.values()) / len(annual_return_data) if annual_return_data else 0
-        
-        return {
-            'sharpe': sharpe,
-            'avg_annual_return': avg_annual_return,
-            'final_value': cerebro.broker.getvalue()
-        }
-    
-    metrics = get_detailed_metrics(best_params)
-    print(f"夏普比率: {metrics['sharpe']:.4f}")
-    print(f"平均年化收益率: {metrics['avg_annual_return']:.4f} ({metrics['avg_annual_return']*100:.2f}%)")
-    print(f"最终资产价值: {metrics['final_value']:.2f}")
+    # 详细指标在试验时已记录到 user_attrs，无需再跑一次回测
+    metrics = best_trial.user_attrs
+    if metrics:
+        print(f"夏普比率: {metrics['sharpe']:.4f}")
+        print(f"平均年化收益率: {metrics['avg_annual_return']:.4f} ({metrics['avg_annual_return']*100:.2f}%)")
+        print(f"最终资产价值: {metrics['final_value']:.2f}")
+        print(f"最大回撤: {metrics['max_drawdown']:.2f}%")
+        print(f"总交易次数: {metrics['total_trades']}")
+    else:
+        print("最佳试验回测出错，无详细指标")
     
     # 显示前3个最佳参数组合
-    trials_df = study.trials_dataframe()
-    if len(trials_df) > 0:
-        sorted_trials = trials_df.nlargest(3, 'value')
+    # 只取已完成的试验直接选出前三名，不为三行输出构建整张 trials_dataframe
+    completed = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+    if completed:
         print("\n前三名参数组合:")
-        
-        # 获取实际存在于DataFrame中的参数列
-        available_columns = []
-        param_keys = list(study.best_params.keys())
-        for param in param_keys:
-            param = f'params_{param}'
-            if param in trials_df.columns:
-                available_columns.append(param)
-        
-        # 只显示存在的列
-        if available_columns:
-            display_columns = ['number', 'value'] + available_columns
-            print(sorted_trials[display_columns])
-        else:
-            print("无可用参数列显示")
+        for trial in heapq.nlargest(3, completed, key=lambda t: t.value):
+            print(f"试验 {trial.number}: 得分 {trial.value:.4f}, 参数 {trial.params}")
 
 def parse_args():
     parser = argparse.ArgumentParser(description='MultiData Strategy')
@@ -329,9 +395,10 @@ def parse_args():
 if __name__ == '__main__':
     args = parse_args()
     if args.optimize:
-        optimize_strategy()
+        optimize_strategy(args)
     else:
         run_tqqq_strategy(strategy_args={'ma_period': args.period, 'batch_size': args.stake_pct / 100.0},
                  symbol=[args.stock0, args.stock1],
                  start_date=args.fromdate,
-                 end_date=args.todate)
+                 end_date=args.todate,
+                 plot=args.plot)
@@ -0,0 +1,283 @@
+import argparse
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.fetch_data import cached_fetch
+from utils._njit import njit, prange
+
+"""
+TQQQ 狙击手策略 - 向量化参数扫描
+
+TQQQSniperStrategy 的信号只依赖 QQQ 收盘价和若干标量阈值，因此可以把上百组参数
+放进一个 (K线数, 参数组数) 的矩阵一次性计算信号，再用 JIT 内核按参数组并行模拟持仓，
+替代逐个试验跑 cerebro 的 Optuna 搜索。
+
+模拟规则与 backtrader 默认 broker 保持一致：
+1. 信号在当根K线收盘产生，市价单在下一根K线开盘成交
+2. order_target_percent 按信号K线收盘价和当前净值计算目标股数，向下取整
+3. 现金不足的买单被拒绝，无手续费
+4. 夏普比率与 bt.analyzers.SharpeRatio(timeframe=Days, annualize=True) 口径一致
+"""
+
+# 与 tqqq_sniper.objective 相同的参数搜索范围
+PARAM_RANGES = {
+    'ma_period': (66, 300),
+    'entry_buffer': (1.01, 1.10),
+    'exit_buffer': (0.90, 0.99),
+    'dip_threshold': (0.95, 0.995),
+    'batch_size': (0.1, 0.5),
+}
+
+
+def rolling_means(close, periods):
+    """
+    一次累加和算出多个窗口的滚动均值
+
+    返回:
+        (K线数, len(periods)) 矩阵，每列前 period-1 个位置为 NaN
+    """
+    close = np.asarray(close, dtype=np.float64)
+    csum = np.cumsum(np.concatenate(([0.0], close)))
+    out = np.full((len(close), len(periods)), np.nan)
+    cache = {}
+    for j, p in enumerate(periods):
+        p = int(p)
+        if p > len(close):
+            continue
+        if p not in cache:
+            cache[p] = (csum[p:] - csum[:-p]) / p
+        out[p - 1:, j] = cache[p]
+    return out
+
+
+def build_signals(close, params):
+    """
+    构造 (K线数, 参数组数) 的清仓 / 入场布尔矩阵
+
+    入场 = 趋势走强（QQQ > 均线 * entry_buffer）且单日回调（QQQ < 昨收 * dip_threshold）
+    """
+    close = np.asarray(close, dtype=np.float64)
+    sma = rolling_means(close, params['ma_period'])
+    prev = np.concatenate(([np.nan], close[:-1]))
+    with np.errstate(invalid='ignore'):
+        exit_mat = close[:, None] < sma * params['exit_buffer'][None, :]
+        trend_mat = close[:, None] > sma * params['entry_buffer'][None, :]
+        dip_mat = close[:, None] < prev[:, None] * params['dip_threshold'][None, :]
+    return exit_mat, trend_mat & dip_mat
+
+
+@njit(cache=True, parallel=True)
+def _simulate(exit_mat, entry_mat, t_open, t_close, batch, max_pos, cash0):
+    """
+    按参数组并行模拟 TQQQ 持仓
+
+    返回:
+        (每根K线收盘后的账户净值矩阵, 每组参数的开仓次数)
+    """
+    n, m = exit_mat.shape
+    values = np.empty((n, m))
+    trades = np.zeros(m, dtype=np.int64)
+    for j in prange(m):
+        cash = cash0
+        shares = 0.0
+        pos_ratio = 0.0
+        pending = 0.0  # 待下一根开盘成交的股数，正为买负为卖
+        for i in range(n):
+            # 上一根K线的订单按本根开盘价成交
+            if pending != 0.0:
+                cost = pending * t_open[i]
+                if pending < 0.0 or cost <= cash:
+                    # 空仓后的首笔成交记为一笔新交易，与 TradeAnalyzer 的 total 口径一致
+                    if shares == 0.0:
+                        trades[j] += 1
+                    cash -= cost
+                    shares += pending
+                pending = 0.0
+
+            price = t_close[i]
+            value = cash + shares * price
+            values[i, j] = value
+
+            # 防御清仓：与策略一致，只有实际持仓时才重置建仓进度
+            if exit_mat[i, j]:
+                if shares > 0.0:
+                    pending = -shares
+                    pos_ratio = 0.0
+                continue
+
+            # 狙击买入
+            if entry_mat[i, j] and pos_ratio < max_pos:
+                target = min(pos_ratio + batch[j], max_pos)
+                diff = value * target - shares * price
+                if diff > 0.0:
+                    pending = np.floor(diff / price)
+                elif diff < 0.0:
+                    pending = -np.floor(-diff / price)
+                pos_ratio = target
+    return values, trades
+
+
+def warmup_kernels():
+    """
+    用极小的输入预先编译 _simulate
+
+    参数类型与 run_sweep / 优化器实际传入的一致（二维 bool 信号矩阵、float64 价格与批次），
+    编译结果写入 numba 磁盘缓存，之后的进程直接加载机器码，首个试验无需等待 JIT 编译。
+    未安装 numba 时为普通函数调用，开销可忽略。
+    """
+    mask = np.zeros((2, 1), dtype=np.bool_)
+    prices = np.ones(2)
+    _simulate(mask, mask, prices, prices, np.ones(1), 1.0, 1.0)
+
+
+# backtrader SharpeRatio 默认口径：年无风险利率 1%，按 252 个交易日折算为日利率并年化
+RISKFREE = 0.01
+FACTOR = 252
+_DAILY_RISKFREE = (1.0 + RISKFREE) ** (1.0 / FACTOR) - 1.0
+_SQRT_FACTOR = np.sqrt(FACTOR)
+
+
+def sharpe_ratios(values, cash0, riskfree=RISKFREE, factor=FACTOR):
+    """按列计算年化夏普比率（日收益、总体标准差，与 backtrader SharpeRatio 默认口径一致）"""
+    prev = np.vstack((np.full((1, values.shape[1]), cash0), values[:-1]))
+    returns = values / prev - 1.0
+    if riskfree == RISKFREE and factor == FACTOR:
+        # 默认口径直接使用导入时算好的常数
+        rate, scale = _DAILY_RISKFREE, _SQRT_FACTOR
+    else:
+        rate, scale = (1.0 + riskfree) ** (1.0 / factor) - 1.0, np.sqrt(factor)
+    excess = returns - rate
+    std = excess.std(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = scale * excess.mean(axis=0) / std
+    return np.where(std > 0, sharpe, np.nan)
+
+
+def max_drawdowns(values):
+    """按列计算最大回撤百分比（与 bt.analyzers.DrawDown 的 max.drawdown 同口径）"""
+    peak = np.maximum.accumulate(values, axis=0)
+    return ((peak - values) / peak).max(axis=0) * 100.0
+
+
+def annual_returns(values, dates, cash0):
+    """
+    按列计算各自然年收益率（与 bt.analyzers.AnnualReturn 同口径）
+
+    返回:
+        (年份数, 参数组数) 矩阵
+    """
+    years = pd.DatetimeIndex(dates).year.to_numpy()
+    # 每年最后一根K线的净值，上一年年末（首年为初始资金）作为基数
+    last = np.flatnonzero(np.append(years[1:] != years[:-1], True))
+    year_end = values[last]
+    prev = np.vstack((np.full((1, values.shape[1]), cash0), year_end[:-1]))
+    return year_end / prev - 1.0
+
+
+def align_prices(qqq_df, tqqq_df):
+    """
+    两条腿按日期对齐
+
+    返回:
+        (日期索引, QQQ 收盘价, TQQQ 开盘价, TQQQ 收盘价)
+    """
+    df = qqq_df[['Close']].join(tqqq_df[['Open', 'Close']], how='inner', rsuffix='_t')
+    return (df.index,
+            df['Close'].to_numpy(np.float64),
+            df['Open'].to_numpy(np.float64),
+            df['Close_t'].to_numpy(np.float64))
+
+
+def sample_params(n_trials, seed=None):
+    """在与 Optuna 目标函数相同的范围内随机采样参数组"""
+    rng = np.random.default_rng(seed)
+    params = {}
+    for name, (low, high) in PARAM_RANGES.items():
+        if name == 'ma_period':
+            params[name] = rng.integers(low, high + 1, n_trials)
+        else:
+            params[name] = rng.uniform(low, high, n_trials)
+    return params
+
+
+def run_sweep(qqq_df, tqqq_df, params, cash=10000, max_pos_pct=0.95):
+    """
+    对一组参数做向量化回测
+
+    参数:
+        qqq_df (pd.DataFrame): 参照物行情，含 Close 列
+        tqqq_df (pd.DataFrame): 交易标的行情，含 Open / Close 列
+        params (dict): 各参数名到等长数组的映射
+        cash (float): 初始资金
+        max_pos_pct (float): 最大仓位
+
+    返回:
+        pd.DataFrame: 每组参数及其夏普比率、最终净值
+    """
+    _, close, t_open, t_close = align_prices(qqq_df, tqqq_df)
+
+    exit_mat, entry_mat = build_signals(close, params)
+    values, trades = _simulate(exit_mat, entry_mat, t_open, t_close,
+                       np.asarray(params['batch_size'], dtype=np.float64),
+                       float(max_pos_pct), float(cash))
+
+    result = pd.DataFrame(params)
+    result['sharpe'] = sharpe_ratios(values, float(cash))
+    result['final_value'] = values[-1]
+    result['max_drawdown'] = max_drawdowns(values)
+    result['total_trades'] = trades
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Vectorized TQQQ Sniper parameter sweep')
+
+    parser.add_argument('--stock0', '-s0',
+                        default='QQQ',
+                        help='symbol of the reference data')
+
+    parser.add_argument('--stock1', '-s1',
+                        default='TQQQ',
+                        help='symbol of the trading data')
+
+    parser.add_argument('--fromdate', '-f',
+                        default='2010-01-01',
+                        help='Starting date in YYYY-MM-DD format')
+
+    parser.add_argument('--todate', '-t',
+                        default='2025-12-25',
+                        help='Ending date in YYYY-MM-DD format')
+
+    parser.add_argument('--cash', default=10000, type=int,
+                        help='Starting Cash')
+
+    parser.add_argument('--trials', '-n', default=100, type=int,
+                        help='Number of parameter sets to evaluate')
+
+    parser.add_argument('--seed', default=None, type=int,
+                        help='Random seed for parameter sampling')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    start_time = time.time()
+
+    qqq_df = cached_fetch(args.stock0, args.fromdate, args.todate, return_df=True)
+    tqqq_df = cached_fetch(args.stock1, args.fromdate, args.todate, return_df=True)
+    params = sample_params(args.trials, args.seed)
+    result = run_sweep(qqq_df, tqqq_df, params, cash=args.cash)
+
+    end_time = time.time()
+    print(f"扫描耗时: {end_time - start_time:.2f} 秒，共 {len(result)} 组参数")
+
+    best = result.nlargest(3, 'sharpe')
+    print("\n=== TQQQ Sniper 向量化扫描结果 ===")
+    print("最优参数:", best.iloc[0][list(PARAM_RANGES)].to_dict())
+    print("最优夏普比率:", best.iloc[0]['sharpe'])
+    print("\n前三名参数组合:")
+    print(best)
@@ -0,0 +1,18 @@
+"""
+pytest 共享夹具
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 项目根目录只在会话开始时加入一次导入路径，各测试文件不再各自修改 sys.path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(scope="session")
+def ollama_service():
+    """整个测试会话共享同一个 Ollama 服务实例，连接检查与 .env 加载只发生一次"""
+    from llm_advisory.services.ollama_service import get_ollama_service
+    return get_ollama_service()
@@ -2,11 +2,7 @@
 测试LLM Advisory信号生成功能
 """
 
-import sys
-import os
-
-# 添加项目根目录到 Python 路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
 
 from llm_advisory.llm_advisor import LLMAdvisor, AdvisoryAdvisor
 from llm_advisory.pydantic_models import (
@@ -90,31 +86,25 @@ def test_signal_generation():
     # 模拟交易信号生成场景
     print("信号生成场景测试:")
     
-    # 场景1: 强烈买入信号
-    signals_strong_buy = [
-        {"signal": "buy", "confidence": 0.8, "type": "trend"},
-        {"signal": "buy", "confidence": 0.7, "type": "rsi"},
-        {"signal": "buy", "confidence": 0.6, "type": "macd"}
-    ]
+    # 场景1: 强烈买入信号（trend / rsi / macd 三个来源）
+    signals = np.array(["buy", "buy", "buy"])
+    confidences = np.array([0.8, 0.7, 0.6])
     
-    # 整合信号
-    buy_votes = sum(1 for s in signals_strong_buy if s["signal"] == "buy")
-    avg_confidence = sum(s["confidence"] for s in signals_strong_buy if s["signal"] == "buy") / buy_votes
+    # 整合信号：按布尔掩码计票并求平均置信度
+    is_buy = signals == "buy"
+    buy_votes = int(is_buy.sum())
+    avg_confidence = confidences[is_buy].mean()
     
     print(f"  场景1 - 强烈买入:")
     print(f"    买入投票: {buy_votes}")
     print(f"    平均置信度: {avg_confidence:.2f}")
     print(f"    决策: {'买入' if avg_confidence > 0.6 else '等待'}")
     
-    # 场景2: 分歧信号
-    signals_mixed = [
-        {"signal": "buy", "confidence": 0.7, "type": "trend"},
-        {"signal": "sell", "confidence": 0.6, "type": "rsi"},
-        {"signal": "none", "confidence": 0.4, "type": "macd"}
-    ]
+    # 场景2: 分歧信号（trend / rsi / macd 三个来源）
+    signals = np.array(["buy", "sell", "none"])
     
-    buy_votes = sum(1 for s in signals_mixed if s["signal"] == "buy")
-    sell_votes = sum(1 for s in signals_mixed if s["signal"] == "sell")
+    buy_votes = int((signals == "buy").sum())
+    sell_votes = int((signals == "sell").sum())
     
     print(f"  场景2 - 信号分歧:")
     print(f"    买入投票: {buy_votes}")
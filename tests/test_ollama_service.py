@@ -4,37 +4,30 @@ Ollama 服务验证脚本
 """
 
 import os
-import sys
 
-# 添加项目根目录到 Python 路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
 
 from llm_advisory.llm_advisor import check_llm_service_availability
 from llm_advisory.services.ollama_service import get_ollama_service
 
 
-def test_ollama_connection():
+def test_ollama_connection(ollama_service):
     """测试 Ollama 连接"""
     print("=== Ollama 连接测试 ===")
     
     try:
-        service = get_ollama_service()
+        service = ollama_service
         
-        # 测试基础连接
-        if service.test_connection():
-            print("✅ Ollama 服务连接成功")
-        else:
-            print("❌ Ollama 服务连接失败")
-            return False
-        
-        # 获取可用模型
+        # 获取可用模型：同一个 /api/tags 请求同时验证连接，不再单独调用 test_connection
         models = service.get_available_models()
         if models:
+            print("✅ Ollama 服务连接成功")
             print(f"✅ 发现 {len(models)} 个模型:")
             for model in models:
                 print(f"   - {model}")
         else:
-            print("⚠️  未发现模型，请下载模型: ollama pull qwen3-vl")
+            print("❌ Ollama 服务连接失败或未发现模型")
+            print("⚠️  请确认 Ollama 正在运行，并下载模型: ollama pull qwen3-vl")
             return False
         
         return True
@@ -44,23 +37,26 @@ def test_ollama_connection():
         return False
 
 
-def test_chat_completion():
+@pytest.mark.parametrize("prompt,max_tokens", [
+    ("请简单介绍一下量化交易", 100),
+])
+def test_chat_completion(ollama_service, prompt, max_tokens):
     """测试聊天完成功能"""
     print("\n=== 聊天完成测试 ===")
     
     try:
-        service = get_ollama_service()
+        service = ollama_service
         
         messages = [
             {"role": "system", "content": "你是一个测试助手，请用中文回答。"},
-            {"role": "user", "content": "请简单介绍一下量化交易"}
+            {"role": "user", "content": prompt}
         ]
         
         response = service.create_chat_completion(
             messages=messages,
             model=os.getenv("OLLAMA_MODEL", default="qwen3-vl"),
             temperature=0.7,
-            max_tokens=100
+            max_tokens=max_tokens
         )
         
         print("✅ 聊天完成测试成功")
@@ -96,12 +92,12 @@ def test_advisory_integration():
         return False
 
 
-def test_trading_prompt():
+def test_trading_prompt(ollama_service):
     """测试交易相关的提示词"""
     print("\n=== 交易提示词测试 ===")
     
     try:
-        service = get_ollama_service()
+        service = ollama_service
         
         # 模拟交易数据
         trading_data = """
@@ -149,12 +145,13 @@ def main():
     print(f"OLLAMA_BASE_URL: {ollama_url}")
     print(f"OLLAMA_MODEL: {ollama_model}")
     
-    # 运行测试
+    # 运行测试：所有用例共享同一个服务实例
+    service = get_ollama_service()
     tests = [
-        test_ollama_connection,
-        test_chat_completion,
+        lambda: test_ollama_connection(service),
+        lambda: test_chat_completion(service, "请简单介绍一下量化交易", 100),
         test_advisory_integration,
-        test_trading_prompt
+        lambda: test_trading_prompt(service)
     ]
     
     results = []
@@ -0,0 +1,28 @@
+"""Shared fixtures for the llm_advisory tests"""
+
+import importlib
+
+import pytest
+
+LLM_MODULES = [
+    'llm_advisory.bt_advisory',
+    'llm_advisory.bt_advisor',
+    'llm_advisory.state_advisors.bt_advisory_advisor',
+    'llm_advisory.advisors.bt_candle_pattern_advisor',
+    'llm_advisory.advisors.bt_trend_advisor',
+    'llm_advisory.advisors.bt_technical_analysis_advisor',
+    'llm_advisory.advisors.bt_strategy_advisor',
+    'llm_advisory.advisors.bt_reversal_advisor',
+    'llm_advisory.advisors.bt_persona_advisor',
+    'llm_advisory.advisors.bt_feedback_advisor',
+    'llm_advisory.pydantic_models',
+    'llm_advisory.llm_advisor',
+    'llm_advisory.llm_advisory',
+    'llm_advisory.helper.llm_prompt',
+]
+
+
+@pytest.fixture(scope="session")
+def llm_modules():
+    """Import every llm_advisory module once per session, keyed by dotted name"""
+    return {name: importlib.import_module(name) for name in LLM_MODULES}
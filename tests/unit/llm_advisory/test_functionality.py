@@ -1,11 +1,6 @@
 """Test functionality for llm_advisory module"""
 
 import unittest
-import sys
-import os
-
-# Add the project root to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
 
 import backtrader as bt
 from llm_advisory.llm_advisor import (
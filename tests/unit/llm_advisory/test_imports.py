@@ -1,30 +1,34 @@
 """Test imports for llm_advisory module"""
 
+import importlib.util
 import unittest
 import sys
-import os
 
-# Add the project root to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
+import pytest
+
 
 class TestLLMAdvisoryImports(unittest.TestCase):
     """Test that all llm_advisory modules can be imported correctly"""
+
+    @pytest.fixture(autouse=True)
+    def _use_llm_modules(self, llm_modules):
+        # Modules come from the session fixture in conftest.py and are imported only once
+        self.modules = llm_modules
     
     def test_bt_advisory_import(self):
         """Test bt_advisory module import"""
-        import llm_advisory.bt_advisory
-        self.assertTrue(hasattr(llm_advisory.bt_advisory, 'BacktraderLLMAdvisory'))
-        self.assertTrue(hasattr(llm_advisory.bt_advisory, 'DATA_LOOKBACK_PERIOD'))
+        module = self.modules['llm_advisory.bt_advisory']
+        self.assertTrue(hasattr(module, 'BacktraderLLMAdvisory'))
+        self.assertTrue(hasattr(module, 'DATA_LOOKBACK_PERIOD'))
         
     def test_bt_advisor_import(self):
         """Test bt_advisor module import"""
-        import llm_advisory.bt_advisor
-        self.assertTrue(hasattr(llm_advisory.bt_advisor, 'BacktraderLLMAdvisor'))
+        self.assertTrue(hasattr(self.modules['llm_advisory.bt_advisor'], 'BacktraderLLMAdvisor'))
         
     def test_state_advisors_import(self):
         """Test state advisors imports"""
-        import llm_advisory.state_advisors.bt_advisory_advisor
-        self.assertTrue(hasattr(llm_advisory.state_advisors.bt_advisory_advisor, 'BacktraderAdvisoryAdvisor'))
+        module = self.modules['llm_advisory.state_advisors.bt_advisory_advisor']
+        self.assertTrue(hasattr(module, 'BacktraderAdvisoryAdvisor'))
         
     def test_advisors_imports(self):
         """Test all advisor imports"""
@@ -40,32 +44,31 @@ class TestLLMAdvisoryImports(unittest.TestCase):
         
         for advisor in advisors_to_test:
             with self.subTest(advisor=advisor):
-                module = __import__(f'llm_advisory.advisors.{advisor}', fromlist=['*'])
+                module = self.modules[f'llm_advisory.advisors.{advisor}']
                 class_name = f'Backtrader{advisor.replace("bt_", "").title().replace("_", "")}'
                 self.assertTrue(hasattr(module, class_name))
                 
     def test_pydantic_models_import(self):
         """Test pydantic models import"""
-        import llm_advisory.pydantic_models
-        self.assertTrue(hasattr(llm_advisory.pydantic_models, 'BacktraderLLMAdvisorSignal'))
-        self.assertTrue(hasattr(llm_advisory.pydantic_models, 'BacktraderLLMAdvisorAdvice'))
+        module = self.modules['llm_advisory.pydantic_models']
+        self.assertTrue(hasattr(module, 'BacktraderLLMAdvisorSignal'))
+        self.assertTrue(hasattr(module, 'BacktraderLLMAdvisorAdvice'))
         
     def test_base_classes_import(self):
         """Test base classes import"""
-        import llm_advisory.llm_advisor
-        import llm_advisory.llm_advisory
-        import llm_advisory.helper.llm_prompt
+        llm_advisor = self.modules['llm_advisory.llm_advisor']
         
         # Test base classes
-        self.assertTrue(hasattr(llm_advisory.llm_advisor, 'LLMAdvisor'))
-        self.assertTrue(hasattr(llm_advisory.llm_advisor, 'AdvisoryAdvisor'))
-        self.assertTrue(hasattr(llm_advisory.llm_advisor, 'PersonaAdvisor'))
-        self.assertTrue(hasattr(llm_advisory.llm_advisory, 'LLMAdvisory'))
-        self.assertTrue(hasattr(llm_advisory.helper.llm_prompt, 'compile_data_artefacts'))
+        self.assertTrue(hasattr(llm_advisor, 'LLMAdvisor'))
+        self.assertTrue(hasattr(llm_advisor, 'AdvisoryAdvisor'))
+        self.assertTrue(hasattr(llm_advisor, 'PersonaAdvisor'))
+        self.assertTrue(hasattr(self.modules['llm_advisory.llm_advisory'], 'LLMAdvisory'))
+        self.assertTrue(hasattr(self.modules['llm_advisory.helper.llm_prompt'], 'compile_data_artefacts'))
         
     def test_complete_imports(self):
-        """Test that all modules can be imported together without conflicts"""
-        # Test importing all modules sequentially
+        """Test that every llm_advisory module can be located"""
+        # Attribute checks above already import these modules; here only presence
+        # is checked, so find_spec avoids re-running the heavy transitive imports
         modules = [
             'llm_advisory.bt_advisory',
             'llm_advisory.bt_advisor',
@@ -84,11 +87,10 @@ class TestLLMAdvisoryImports(unittest.TestCase):
         
         for module_name in modules:
             with self.subTest(module=module_name):
-                try:
-                    __import__(module_name)
-                except ImportError as e:
-                    self.fail(f"Failed to import {module_name}: {e}")
+                self.assertIsNotNone(importlib.util.find_spec(module_name),
+                                     f"Module {module_name} not found")
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    # The fixtures above need pytest; plain unittest.main() would not inject them
+    sys.exit(pytest.main([__file__]))
\ No newline at end of file
@@ -1,27 +1,49 @@
 """Test OpenAI integration for llm_advisory module"""
 
+import functools
+import importlib.util
 import unittest
-import sys
 import os
-from unittest.mock import Mock, patch
-
-# Add the project root to the Python path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../')))
-
-from llm_advisory.llm_advisor import LLMAdvisor, LLMAdvisorUpdateStateData, LLMMessage
-# Import with handling for missing configuration
-try:
-    from llm_advisory.services.openai_service import OpenAIService
-    OPENAI_SERVICE_AVAILABLE = True
-except ValueError as e:
-    if "OPENAI_API_KEY not configured" in str(e):
-        OPENAI_SERVICE_AVAILABLE = False
-        OpenAIService = None
-    else:
-        raise
-except Exception:
-    OPENAI_SERVICE_AVAILABLE = False
-    OpenAIService = None
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+# Every test here mocks the OpenAI client, so when the openai package is not
+# installed a stand-in module is used for the duration of this module only
+_openai_modules = patch.dict(
+    sys.modules, {} if importlib.util.find_spec('openai') else {'openai': MagicMock()})
+
+LLMAdvisor = LLMAdvisorUpdateStateData = LLMMessage = OpenAIService = None
+OPENAI_SERVICE_AVAILABLE = False
+
+
+def setUpModule():
+    global LLMAdvisor, LLMAdvisorUpdateStateData, LLMMessage, OpenAIService, OPENAI_SERVICE_AVAILABLE
+    _openai_modules.start()
+    from llm_advisory.llm_advisor import LLMAdvisor, LLMAdvisorUpdateStateData, LLMMessage
+    # Import with handling for missing configuration
+    try:
+        from llm_advisory.services.openai_service import OpenAIService
+        OPENAI_SERVICE_AVAILABLE = True
+    except ValueError as e:
+        if "OPENAI_API_KEY not configured" not in str(e):
+            raise
+    except Exception:
+        pass
+
+
+def tearDownModule():
+    # Also drops the llm_advisory modules imported against the stand-in
+    _openai_modules.stop()
+
+
+ENV_PATH = Path(__file__).resolve().parents[3] / '.env'
+
+
+@functools.lru_cache(maxsize=1)
+def _env_contents():
+    """Read the project .env once per session; None if the file does not exist"""
+    return ENV_PATH.read_text() if ENV_PATH.exists() else None
 
 
 class TestOpenAIIntegration(unittest.TestCase):
@@ -136,12 +158,9 @@ class TestOpenAIConfiguration(unittest.TestCase):
     
     def test_env_file_configuration(self):
         """Test that .env file contains required OpenAI configuration"""
-        env_path = os.path.join(os.path.dirname(__file__), '../../../.env')
-        
-        self.assertTrue(os.path.exists(env_path), ".env file should exist")
+        env_content = _env_contents()
         
-        with open(env_path, 'r') as f:
-            env_content = f.read()
+        self.assertIsNotNone(env_content, ".env file should exist")
         
         # Check for required configuration
         self.assertIn("OPENAI_BASE_URL", env_content)
@@ -0,0 +1,47 @@
+"""Test the per-bar decision kernel in strategies.intraday_momentum"""
+
+import math
+import unittest
+
+from strategies.intraday_momentum import ACTION_BUY, ACTION_CLOSE, ACTION_NONE, _decide
+
+# stop loss, take profit and volume-ratio threshold of the default strategy params
+SL, TP, VOL_THR = 0.025, 0.025, 1.25
+
+
+def decide(price, hhmm, pos_size=0.0, entry_px=0.0, high=None, fhigh=10.0, vol_ratio=2.0):
+    """Call _decide with the default thresholds; high defaults to price"""
+    return _decide(price, price if high is None else high, fhigh, vol_ratio, hhmm,
+                   pos_size, entry_px, SL, TP, VOL_THR)
+
+
+class TestDecide(unittest.TestCase):
+    """Entry, exit and volume filtering of _decide"""
+
+    def test_breakout_buys_when_flat(self):
+        self.assertEqual(decide(10.5, 1000), ACTION_BUY)
+        self.assertEqual(decide(9.5, 1000), ACTION_NONE)
+
+    def test_no_entry_during_opening_range(self):
+        """A NaN opening high never triggers a breakout"""
+        self.assertEqual(decide(10.5, 935, fhigh=math.nan), ACTION_NONE)
+
+    def test_low_volume_is_ignored(self):
+        self.assertEqual(decide(10.5, 1000, vol_ratio=1.0), ACTION_NONE)
+        self.assertEqual(decide(20.0, 1000, pos_size=100.0, entry_px=10.0, vol_ratio=1.0), ACTION_NONE)
+
+    def test_take_profit_and_stop_loss(self):
+        self.assertEqual(decide(10.3, 1000, pos_size=100.0, entry_px=10.0), ACTION_CLOSE)
+        self.assertEqual(decide(9.7, 1000, pos_size=100.0, entry_px=10.0), ACTION_CLOSE)
+        self.assertEqual(decide(10.1, 1000, pos_size=100.0, entry_px=10.0), ACTION_NONE)
+
+    def test_force_close_before_market_close(self):
+        self.assertEqual(decide(10.1, 1456, pos_size=100.0, entry_px=10.0), ACTION_CLOSE)
+
+    def test_force_close_with_take_profit_closes_once(self):
+        """A bar hitting both the 14:55 cut-off and take profit yields a single close"""
+        self.assertEqual(decide(10.5, 1456, pos_size=100.0, entry_px=10.0), ACTION_CLOSE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Test that the vectorized backtest in strategies.tqqq_sniper matches the Cerebro run"""
+
+import unittest
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+from strategies.tqqq_sniper import TQQQSniperStrategy, _vector_backtest
+from strategies.tqqq_vectorized import align_prices
+
+PARAMS = {
+    'ma_period': 20,
+    'entry_buffer': 1.01,
+    'exit_buffer': 0.97,
+    'dip_threshold': 0.99,
+    'batch_size': 0.25,
+}
+
+
+def _random_walk(seed=7, n=750):
+    """Reference and 3x leveraged OHLC frames from a seeded random walk"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2015-01-01', periods=n)
+    returns = rng.normal(0.0008, 0.015, n)
+    frames = []
+    for leverage in (1.0, 3.0):
+        close = 100.0 * np.cumprod(1.0 + leverage * returns)
+        open_ = np.concatenate(([100.0], close[:-1])) * (1.0 + rng.normal(0.0, 0.003, n))
+        frames.append(pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close),
+            'Low': np.minimum(open_, close),
+            'Close': close,
+            'Volume': 1e6,
+        }, index=index))
+    return frames
+
+
+class TestVectorBacktest(unittest.TestCase):
+    """_vector_backtest reproduces TQQQSniperStrategy under the default broker"""
+
+    def test_matches_cerebro(self):
+        qqq_df, tqqq_df = _random_walk()
+
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.broker.setcash(10000)
+        cerebro.adddata(bt.feeds.PandasData(dataname=qqq_df))
+        cerebro.adddata(bt.feeds.PandasData(dataname=tqqq_df))
+        cerebro.addstrategy(TQQQSniperStrategy, print_log=False, **PARAMS)
+        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe',
+                            timeframe=bt.TimeFrame.Days, annualize=True)
+        cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
+        cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+        strat = cerebro.run()[0]
+
+        metrics = _vector_backtest(align_prices(qqq_df, tqqq_df), PARAMS, cash=10000)
+
+        trades = strat.analyzers.trades.get_analysis()
+        self.assertGreater(metrics['total_trades'], 0)
+        self.assertEqual(metrics['total_trades'], trades.total.total)
+        self.assertAlmostEqual(metrics['final_value'], cerebro.broker.getvalue(), places=6)
+        self.assertAlmostEqual(metrics['sharpe'], strat.analyzers.sharpe.get_analysis()['sharperatio'], places=6)
+        self.assertAlmostEqual(metrics['max_drawdown'], strat.analyzers.drawdown.get_analysis().max.drawdown,
+                               places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
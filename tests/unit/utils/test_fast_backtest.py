@@ -0,0 +1,100 @@
+"""Test the NumPy evaluator in utils.fast_backtest"""
+
+import unittest
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+from utils import fast_backtest
+
+FAST, SLOW, RSI, RSI_UPPER = 5, 20, 14, 70.0
+COMMISSION, RISKFREE = 0.001, 0.02
+
+
+class _FractionalComm(bt.CommInfoBase):
+    """Percentage commission with fractional sizes, so a full position uses all the cash like evaluate does"""
+
+    params = (
+        ('commission', COMMISSION),
+        ('commtype', bt.CommInfoBase.COMM_PERC),
+        ('percabs', True),
+        ('stocklike', True),
+    )
+
+    def getsize(self, price, cash):
+        # leave room for the commission; the tiny margin keeps float rounding from triggering Margin
+        return cash / (price * (1.0 + self.p.commission)) * (1.0 - 1e-9)
+
+
+class _SmaRsiCross(bt.Strategy):
+    """The rule evaluate implements: long on fast > slow unless RSI is overbought, flat on fast < slow"""
+
+    def __init__(self):
+        self.diff = (bt.indicators.SMA(self.data.close, period=FAST) -
+                     bt.indicators.SMA(self.data.close, period=SLOW))
+        self.rsi = bt.indicators.RSI(self.data.close, period=RSI, safediv=True)
+
+    def next(self):
+        if self.diff[0] > 0:
+            if not self.position and self.rsi[0] < RSI_UPPER:
+                self.order_target_percent(target=1.0)
+        elif self.diff[0] < 0 and self.position:
+            self.close()
+
+
+class TestFastBacktest(unittest.TestCase):
+    """Test indicator kernels and the single-pass evaluator"""
+
+    def test_sma_matches_window_mean(self):
+        close = np.arange(1.0, 11.0)
+        sma = fast_backtest._sma(close, 3)
+        self.assertTrue(np.isnan(sma[:2]).all())
+        np.testing.assert_allclose(sma[2:], [np.mean(close[i - 2:i + 1]) for i in range(2, 10)])
+
+    def test_rsi_bounds(self):
+        rising = np.arange(1.0, 31.0)
+        self.assertEqual(fast_backtest._rsi(rising, 14)[-1], 100.0)
+        falling = rising[::-1].copy()
+        self.assertEqual(fast_backtest._rsi(falling, 14)[-1], 0.0)
+
+    def test_no_position_without_crossover(self):
+        """A steadily falling series never has fast > slow, so nothing is traded"""
+        close = np.linspace(100.0, 50.0, 300)
+        sharpe, annual_return, max_dd = fast_backtest.evaluate(close, 5, 20, 14)
+        self.assertEqual(annual_return, 0.0)
+        self.assertEqual(max_dd, 0.0)
+
+    def test_matches_cerebro(self):
+        """Sharpe, annual return and max drawdown agree with a cheat-on-close Cerebro run of the same rule"""
+        rng = np.random.default_rng(3)
+        close = 100.0 * np.cumprod(1.0 + rng.normal(0.0005, 0.015, 500))
+        df = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1e6},
+                          index=pd.bdate_range('2020-01-01', periods=len(close)))
+
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.broker.setcash(10000)
+        # evaluate fills at the signal bar's close
+        cerebro.broker.set_coc(True)
+        cerebro.broker.addcommissioninfo(_FractionalComm())
+        cerebro.adddata(bt.feeds.PandasData(dataname=df))
+        cerebro.addstrategy(_SmaRsiCross)
+        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe', timeframe=bt.TimeFrame.Days,
+                            riskfreerate=RISKFREE, annualize=True)
+        cerebro.addanalyzer(bt.analyzers.Returns, _name='returns', tann=252)
+        cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
+        cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+        strat = cerebro.run()[0]
+
+        sharpe, annual_return, max_dd = fast_backtest.evaluate(close, FAST, SLOW, RSI, RSI_UPPER,
+                                                               COMMISSION, RISKFREE, 252)
+
+        self.assertGreater(strat.analyzers.trades.get_analysis().total.total, 5)
+        # Cerebro counts one more (flat) bar than evaluate, so the statistics differ slightly
+        self.assertAlmostEqual(sharpe, strat.analyzers.sharpe.get_analysis()['sharperatio'], delta=0.01)
+        self.assertAlmostEqual(annual_return, strat.analyzers.returns.get_analysis()['rnorm100'], delta=0.5)
+        self.assertAlmostEqual(max_dd, strat.analyzers.drawdown.get_analysis().max.drawdown, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
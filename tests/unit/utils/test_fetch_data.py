@@ -0,0 +1,97 @@
+"""Test the local snapshot cache in utils.fetch_data"""
+
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+
+import backtrader as bt
+import pandas as pd
+
+from utils import fetch_data
+
+
+def _sample_frame():
+    """Distinct values per field so that any column swap is visible"""
+    index = pd.date_range('2024-01-01', periods=3, freq='D', name='Date')
+    return pd.DataFrame({
+        'Open': [10.0, 11.0, 12.0],
+        'Close': [20.0, 21.0, 22.0],
+        'High': [30.0, 31.0, 32.0],
+        'Low': [5.0, 6.0, 7.0],
+        'Volume': [100.0, 200.0, 300.0],
+    }, index=index)
+
+
+class _RecordBars(bt.Strategy):
+    def __init__(self):
+        self.bars = []
+
+    def next(self):
+        d = self.data
+        self.bars.append((d.open[0], d.high[0], d.low[0], d.close[0], d.volume[0]))
+
+
+class TestSnapshotCache(unittest.TestCase):
+    """Test _cached_download and the feeds built from its snapshots"""
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmpdir.cleanup)
+        patcher = patch.object(fetch_data, '_snapshot_path',
+                               lambda file_name: os.path.join(self._tmpdir.name, file_name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cache_hit_skips_loader(self):
+        """Second call reads the snapshot instead of calling the loader"""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return _sample_frame()
+
+        path = fetch_data._cached_download('AAA.parquet', loader)
+        self.assertTrue(path.endswith('.parquet'))
+        df = fetch_data._cached_download('AAA.parquet', loader, return_df=True)
+        self.assertEqual(len(calls), 1)
+        pd.testing.assert_frame_equal(df, _sample_frame(), check_freq=False)
+
+    def test_legacy_csv_snapshot(self):
+        """An existing CSV snapshot with the same name is still used"""
+        _sample_frame().to_csv(os.path.join(self._tmpdir.name, 'BBB.csv'))
+        df = fetch_data._cached_download('BBB.parquet', lambda: self.fail("loader called"), return_df=True)
+        self.assertEqual(list(df.columns), fetch_data.OHLCV_COLUMNS)
+        self.assertEqual(df['Open'].tolist(), [10.0, 11.0, 12.0])
+
+    def test_feed_field_mapping(self):
+        """The feed built from a snapshot maps each column to the matching OHLCV line"""
+        path = fetch_data._cached_download('CCC.parquet', _sample_frame)
+
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.adddata(bt.feeds.PandasData(dataname=fetch_data._read_snapshot(path),
+                                           **fetch_data._PANDAS_FEED_KWARGS))
+        cerebro.addstrategy(_RecordBars)
+        strat = cerebro.run()[0]
+
+        self.assertEqual(strat.bars[0], (10.0, 30.0, 5.0, 20.0, 100.0))
+        self.assertEqual(strat.bars[-1], (12.0, 32.0, 7.0, 22.0, 300.0))
+
+
+class TestAkshareMarket(unittest.TestCase):
+    """Test the suffix lookup used by download_akshare_data"""
+
+    def test_known_suffixes(self):
+        self.assertEqual(fetch_data._akshare_market('600000.XSHG'), ('cn', '600000'))
+        self.assertEqual(fetch_data._akshare_market('600000.SH'), ('cn', '600000'))
+        self.assertEqual(fetch_data._akshare_market('000001.XSHE'), ('cn', '000001'))
+        self.assertEqual(fetch_data._akshare_market('000001.SZ'), ('cn', '000001'))
+        self.assertEqual(fetch_data._akshare_market('AAPL.US'), ('us', 'AAPL'))
+
+    def test_fallback_without_suffix(self):
+        self.assertEqual(fetch_data._akshare_market('GOOGL'), ('us', 'GOOGL'))
+        self.assertEqual(fetch_data._akshare_market('000001'), ('cn', '000001'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,17 @@
-from .fetch_data import get_yfinance_data, download_yfinance_data, get_akshare_data
-from .base_strategy import BaseStrategy
-from .runer import run_strategy
\ No newline at end of file
+# 子模块按需导入：只用到 utils.rolling / utils._njit 等轻量模块时，不必加载 yfinance 与 backtrader
+_LAZY_ATTRS = {
+    'get_yfinance_data': '.fetch_data',
+    'download_yfinance_data': '.fetch_data',
+    'get_akshare_data': '.fetch_data',
+    'BaseStrategy': '.base_strategy',
+    'run_strategy': '.runer',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
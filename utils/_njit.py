@@ -0,0 +1,23 @@
+"""
+numba 可选依赖封装
+
+安装了 numba 时 ``njit`` / ``prange`` 即 numba 原生实现；未安装时 ``njit`` 退化为
+不做任何处理的装饰器、``prange`` 退化为 ``range``，被装饰的函数按普通 Python 函数执行，
+结果一致，只是没有 JIT 加速与并行。
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        # 兼容 @njit 与 @njit(cache=True) 两种写法
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
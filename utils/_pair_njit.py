@@ -0,0 +1,88 @@
+"""
+配对交易滚动计算内核
+
+把 OLS_TransformationN + SMA + StdDev 三层滚动指标合并为一次 O(N) 遍历，
+窗口内的 Σx、Σy、Σxy、Σx² 以及价差的 Σs、Σs² 均为增量更新。
+"""
+
+import math
+
+import numpy as np
+
+from utils._njit import njit
+
+
+@njit(cache=True)
+def rolling_pair_zscore(c0, c1, ols_period, period):
+    """
+    计算配对交易价差的滚动 z-score
+
+    以 c0 对 c1 做 ols_period 窗口 OLS（y = alpha + beta * x），价差取
+    ``c0 - (c0 - (beta * c1 + alpha))``，与 SafePairTradingStrategy 原先
+    ``data0.close - OLS_TransformationN`` 的取值一致；再对价差做 period 窗口的
+    均值/总体标准差标准化。
+
+    参数:
+        c0: data0 收盘价数组（因变量）
+        c1: data1 收盘价数组（自变量），须与 c0 按日期对齐
+        ols_period: OLS 回归窗口长度
+        period: 价差标准化窗口长度
+
+    返回:
+        与输入等长的 z-score 数组，前 ols_period + period - 2 个位置为 NaN
+    """
+    n = len(c0)
+    z = np.full(n, np.nan)
+    spread = np.full(n, np.nan)
+
+    sx = 0.0
+    sy = 0.0
+    sxy = 0.0
+    sxx = 0.0
+    ss = 0.0
+    ss2 = 0.0
+
+    for i in range(n):
+        x = c1[i]
+        y = c0[i]
+        sx += x
+        sy += y
+        sxy += x * y
+        sxx += x * x
+        if i >= ols_period:
+            xo = c1[i - ols_period]
+            yo = c0[i - ols_period]
+            sx -= xo
+            sy -= yo
+            sxy -= xo * yo
+            sxx -= xo * xo
+
+        if i < ols_period - 1:
+            continue
+
+        # 窗口 OLS: beta = (nΣxy - ΣxΣy) / (nΣx² - (Σx)²)
+        den = ols_period * sxx - sx * sx
+        if den == 0.0:
+            # 窗口内 x 恒定（如停牌），退化为常数拟合，避免 NaN 污染累加和
+            beta = 0.0
+        else:
+            beta = (ols_period * sxy - sx * sy) / den
+        alpha = (sy - beta * sx) / ols_period
+        s = beta * x + alpha
+        spread[i] = s
+
+        ss += s
+        ss2 += s * s
+        if i >= ols_period + period - 1:
+            so = spread[i - period]
+            ss -= so
+            ss2 -= so * so
+
+        if i >= ols_period + period - 2:
+            mean = ss / period
+            var = ss2 / period - mean * mean
+            std = math.sqrt(var) if var > 0.0 else 0.0
+            if std > 0.0:
+                z[i] = (s - mean) / std
+
+    return z
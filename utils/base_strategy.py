@@ -9,11 +9,16 @@ class BaseStrategy(bt.Strategy):
         ("broker_starting_cash", 10000),  # 每次交易股数
     )
     
-    def log(self, txt, dt=None):
-        """日志记录"""
+    def log(self, txt, *args, dt=None):
+        """
+        日志记录
+
+        txt 可带 % 占位符，参数通过 args 传入，仅在 print_log 开启时才格式化，
+        参数优化等关闭日志的场景不再为被丢弃的消息拼接字符串
+        """
         if self.params.print_log:
             dt = dt or self.datas[0].datetime.date(0)
-            print(f"{dt.isoformat()}, {txt}")
+            print(f"{dt.isoformat()}, {txt % args if args else txt}")
 
     def __init__(self):
         self.order = None
@@ -26,15 +31,15 @@ class BaseStrategy(bt.Strategy):
         
         if order.status in [order.Completed]:
             if order.isbuy():
-                self.log(f"多头信号 - 买入成交: {order.executed.price:.2f}, 数量: {order.executed.size}")
+                self.log("多头信号 - 买入成交: %.2f, 数量: %s", order.executed.price, order.executed.size)
             else:
-                self.log(f"空头信号 - 卖出成交: {order.executed.price:.2f}, 数量: {order.executed.size}")
+                self.log("空头信号 - 卖出成交: %.2f, 数量: %s", order.executed.price, order.executed.size)
             
             self.trade_count += 1
         elif order.status in [order.Margin, order.Partial]:
             self.log("订单部分成交或保证金不足")
         elif order.status in [order.Canceled,  order.Rejected]:
-            self.log("订单失败: {}".format(order.getstatusname()))
+            self.log("订单失败: %s", order.getstatusname())
             
         self.order = None
         
@@ -44,8 +49,8 @@ class BaseStrategy(bt.Strategy):
             return
 
         self.log(
-            "交易操盘利润OPERATION PROFIT, 毛利GROSS %.2f, 净利NET %.2f"
-            % (trade.pnl, trade.pnlcomm)
+            "交易操盘利润OPERATION PROFIT, 毛利GROSS %.2f, 净利NET %.2f",
+            trade.pnl, trade.pnlcomm
         )
         
     def stop(self):
@@ -53,7 +58,7 @@ class BaseStrategy(bt.Strategy):
         final_value = self.broker.getvalue()
         initial_cash = self.params.broker_starting_cash
         
-        self.log(f"策略结束 - 最终资产: {final_value:.2f}")
-        self.log(f"总交易次数: {self.trade_count}")
-        self.log(f"收益率: {(final_value - initial_cash) / initial_cash * 100:.2f}%")
+        self.log("策略结束 - 最终资产: %.2f", final_value)
+        self.log("总交易次数: %d", self.trade_count)
+        self.log("收益率: %.2f%%", (final_value - initial_cash) / initial_cash * 100)
 
@@ -0,0 +1,127 @@
+"""
+均线交叉 + RSI 过滤策略的快速评估内核
+
+供 NormalizedMultiObjectiveOptimizer 的差分进化内循环使用：只根据收盘价数组一次遍历
+算出夏普比率、年化收益率与最大回撤，不经过 cerebro 与分析器。交易规则为：
+
+1. 快线（SMA）上穿慢线且 RSI 未超买时全仓做多，快线跌回慢线下方时清仓
+2. 信号在当根K线收盘产生，下一根K线按收盘价计收益；仓位变化按 commission 扣费
+3. 指标口径与 backtrader 一致：SMA 为简单均线，RSI 为 Wilder 平滑
+
+评估结果用于在参数空间中筛选候选，最终参数仍应以完整 cerebro 回测确认。
+"""
+
+import math
+
+import numpy as np
+
+from utils._njit import njit
+
+
+@njit(cache=True)
+def _sma(close, period):
+    n = len(close)
+    out = np.full(n, np.nan)
+    s = 0.0
+    for i in range(n):
+        s += close[i]
+        if i >= period:
+            s -= close[i - period]
+        if i >= period - 1:
+            out[i] = s / period
+    return out
+
+
+@njit(cache=True)
+def _rsi(close, period):
+    """Wilder 平滑的 RSI，与 bt.indicators.RSI 默认口径一致"""
+    n = len(close)
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+    up = 0.0
+    down = 0.0
+    for i in range(1, period + 1):
+        diff = close[i] - close[i - 1]
+        if diff > 0.0:
+            up += diff
+        else:
+            down -= diff
+    up /= period
+    down /= period
+    for i in range(period, n):
+        if i > period:
+            diff = close[i] - close[i - 1]
+            up = (up * (period - 1) + max(diff, 0.0)) / period
+            down = (down * (period - 1) + max(-diff, 0.0)) / period
+        out[i] = 100.0 if down == 0.0 else 100.0 - 100.0 / (1.0 + up / down)
+    return out
+
+
+@njit(cache=True)
+def evaluate(close, fast_period, slow_period, rsi_period,
+             rsi_upper=70.0, commission=0.001, riskfree=0.02, factor=252):
+    """
+    评估一组参数
+
+    参数:
+        close: 收盘价数组（float64）
+        fast_period / slow_period: 快慢均线周期
+        rsi_period: RSI 周期
+        rsi_upper: RSI 超买阈值，超过时不开仓
+        commission: 每次调仓按成交额收取的费率
+        riskfree: 年无风险利率（与 SharpeRatio(riskfreerate=...) 一致）
+        factor: 年化因子
+
+    返回:
+        (年化夏普比率, 年化收益率百分比, 最大回撤百分比)
+    """
+    n = len(close)
+    fast = _sma(close, fast_period)
+    slow = _sma(close, slow_period)
+    rsi = _rsi(close, rsi_period)
+    rate = (1.0 + riskfree) ** (1.0 / factor) - 1.0
+
+    pos = 0.0
+    value = 1.0
+    peak = 1.0
+    max_dd = 0.0
+    s = 0.0
+    s2 = 0.0
+    log_sum = 0.0
+    for i in range(1, n):
+        # 上一根收盘的仓位承担本根收益
+        ret = pos * (close[i] / close[i - 1] - 1.0)
+
+        # 本根收盘产生信号，调仓成本计入本根
+        target = pos
+        if fast[i] > slow[i]:
+            if pos == 0.0 and rsi[i] < rsi_upper:
+                target = 1.0
+        elif fast[i] < slow[i]:
+            target = 0.0
+        if target != pos:
+            ret -= commission
+            pos = target
+
+        value *= 1.0 + ret
+        if value > peak:
+            peak = value
+        dd = (peak - value) / peak
+        if dd > max_dd:
+            max_dd = dd
+
+        excess = ret - rate
+        s += excess
+        s2 += excess * excess
+        log_sum += math.log1p(ret) if ret > -1.0 else -np.inf
+
+    m = n - 1
+    if m <= 0:
+        return 0.0, 0.0, 0.0
+    mean = s / m
+    var = s2 / m - mean * mean
+    sharpe = math.sqrt(factor) * mean / math.sqrt(var) if var > 0.0 else 0.0
+    # 与 bt.analyzers.Returns 的 rnorm100 同口径：平均对数收益按 factor 年化
+    annual_return = (math.exp(log_sum / m * factor) - 1.0) * 100.0
+    return sharpe, annual_return, max_dd * 100.0
@@ -1,11 +1,142 @@
-import yfinance as yf
 import backtrader as bt
 import pandas as pd
 from pathlib import Path
 import os
+import uuid
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Union
 
+OHLCV_COLUMNS = ['Open', 'Close', 'High', 'Low', 'Volume']
+
+# 快照 / 缓存列到 PandasData 数据线的固定映射，各 get_* 函数共用；
+# 显式指定列名后 PandasData 不再逐个数据线按名称自动探测，openinterest 不存在则置为 None
+_PANDAS_FEED_KWARGS = dict(datetime=None, open='Open', high='High', low='Low',
+                           close='Close', volume='Volume', openinterest=None)
+
+# 使用绝对路径确保无论从哪个目录运行都能正确保存文件；路径在导入时解析一次，目录只在首次写入时创建
+_ROOT_DIR = Path(os.path.abspath(__file__)).parent.parent
+_DATAS_DIR = os.path.join(_ROOT_DIR, "datas")
+
+# 缓存命中 / 落盘提示默认关闭，避免参数优化中大量并发调用争用 stdout；设置 FETCH_DATA_VERBOSE=1 开启
+_VERBOSE = bool(int(os.getenv('FETCH_DATA_VERBOSE', '0')))
+
+
+def _date_str(date) -> str:
+    """把 str / datetime 日期统一为 "YYYY-MM-DD" 字符串"""
+    if isinstance(date, datetime):
+        return date.strftime('%Y-%m-%d')
+    return str(date)[:10]
+
+
+def _snapshot_path(file_name:str) -> str:
+    """datas 目录下的本地缓存文件路径"""
+    return os.path.join(_DATAS_DIR, file_name)
+
+
+def _find_snapshot(file_path:str) -> Union[str, None]:
+    """返回已存在的本地缓存文件（优先 parquet，兼容旧版 CSV），都不存在时返回 None"""
+    if os.path.exists(file_path):
+        return file_path
+    legacy_path = os.path.splitext(file_path)[0] + '.csv'
+    if os.path.exists(legacy_path):
+        return legacy_path
+    return None
+
+
+def _read_snapshot(file_path:str) -> pd.DataFrame:
+    """读取本地缓存：parquet 原样保留 dtype 与日期索引，旧版 CSV 需要重新解析日期"""
+    if file_path.endswith('.csv'):
+        # 旧版快照的日期列都是 YYYY-MM-DD，显式给出格式，免去 pandas 逐行推断
+        return pd.read_csv(file_path, index_col=0, parse_dates=[0], date_format='%Y-%m-%d', engine='c')
+    return pd.read_parquet(file_path)
+
+
+def _write_snapshot(df:pd.DataFrame, file_path:str):
+    """以列式压缩的 parquet 保存行情快照"""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    # 先写临时文件再替换，避免并行试验读到写了一半的文件
+    tmp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    df.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+    os.replace(tmp_path, file_path)
+
+
+def _ohlcv_frame(df:pd.DataFrame, date_col, open_col, close_col, high_col, low_col, volume_col) -> pd.DataFrame:
+    """
+    按数据源的原始列名一次挑出 OHLCV 列并以日期为索引，
+    取代 rename -> to_datetime -> set_index -> 选列 的多次整表复制
+    """
+    out = df[[open_col, close_col, high_col, low_col, volume_col]]
+    out.columns = OHLCV_COLUMNS
+    out.index = pd.DatetimeIndex(pd.to_datetime(df[date_col]).to_numpy(), name='datetime')
+    return out
+
+
+def _cached_download(file_name:str, loader, return_df=False, force_download=False) -> Union[str, pd.DataFrame]:
+    """
+    各数据源下载函数共用的缓存流程
+
+    参数:
+        file_name (str): datas 目录下的缓存文件名
+        loader (callable): 缓存未命中时调用，返回带日期索引、含 OHLCV 列的 DataFrame
+        return_df (bool): 是否直接返回DataFrame（新下载的数据此时不落盘）
+        force_download (bool): 是否强制重新下载，即使文件已存在
+
+    返回:
+        pd.DataFrame 或 str: 包含历史数据的DataFrame或文件路径
+    """
+    file_path = _snapshot_path(file_name)
+
+    # 如果文件已存在且不强制下载，直接返回现有文件
+    existing_path = _find_snapshot(file_path)
+    if existing_path and not force_download:
+        if _VERBOSE:
+            print(f"使用现有数据文件: {existing_path}")
+        if return_df:
+            return _read_snapshot(existing_path)
+        return existing_path
+
+    # 选择需要的列并按时间排序，已满足时不再复制
+    df = loader()
+    if list(df.columns) != OHLCV_COLUMNS:
+        df = df[OHLCV_COLUMNS]
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    if return_df:
+        return df
+
+    _write_snapshot(df, file_path)
+    if _VERBOSE:
+        print(f"数据已保存到: {file_path}")
+    return file_path
+
+
+# akshare 代码后缀到市场的映射：A股各交易所后缀共用同一个接口
+_AKSHARE_SUFFIX_MARKETS = {
+    '.XSHG': 'cn',  # 上证
+    '.SH': 'cn',
+    '.XSHE': 'cn',  # 深证
+    '.SZ': 'cn',
+    '.US': 'us',
+}
+
+
+def _akshare_market(instrument:str):
+    """
+    查表判断股票代码所属市场并去掉后缀
+
+    返回:
+        (市场, 代码)；无已知后缀时全字母代码视为美股，其余按A股处理
+    """
+    for suffix, market in _AKSHARE_SUFFIX_MARKETS.items():
+        if instrument.endswith(suffix):
+            return market, instrument[:-len(suffix)]
+    if not any(char.isdigit() for char in instrument):
+        return 'us', instrument
+    return 'cn', instrument
+
+
 def download_akshare_data(instrument:str, start_date:str, end_date:str
                          , return_df=False, force_download=False) -> Union[str, pd.DataFrame]:
     """
@@ -25,108 +156,44 @@ def download_akshare_data(instrument:str, start_date:str, end_date:str
     返回:
         pd.DataFrame 或 str: 包含历史数据的DataFrame或文件路径
     """
-    import akshare as ak
-    # 使用绝对路径确保无论从哪个目录运行都能正确保存文件
-    current_dir = Path(os.path.abspath(__file__)).parent.parent
-    datas_dir = os.path.join(current_dir, "datas")
-    os.makedirs(datas_dir, exist_ok=True)
-    
-    if isinstance(start_date, datetime):
-       start_date = start_date.strftime('%Y-%m-%d') 
-    if isinstance(end_date, datetime):
-        end_date = end_date.strftime('%Y-%m-%d')
-    
-    file_name = f"akshare_{instrument.replace('.', '_')}_{start_date[:10]}_to_{end_date[:10]}.csv"
-    file_path = os.path.join(datas_dir, file_name)
-    
-    # 如果文件已存在且不强制下载，直接返回现有文件
-    if os.path.exists(file_path) and not force_download:
-        print(f"使用现有数据文件: {file_path}")
-        if return_df:
-            df = pd.read_csv(file_path, index_col=0, parse_dates=True)
-            return df
-        return file_path
-    
-    try:
-        # 根据股票代码判断市场类型
-        if instrument.endswith('.XSHG') or instrument.endswith('.SH'):
-            # 上海交易所股票，去掉后缀
-            symbol = instrument.replace('.XSHG', '').replace('.SH', '')
-            df = ak.stock_zh_a_hist(symbol=symbol, period="daily", 
-                                  start_date=start_date.replace('-', ''), 
-                                  end_date=end_date.replace('-', ''), 
-                                  adjust="qfq")  # 前复权
-        elif instrument.endswith('.XSHE') or instrument.endswith('.SZ'):
-            # 深圳交易所股票，去掉后缀
-            symbol = instrument.replace('.XSHE', '').replace('.SZ', '')
-            df = ak.stock_zh_a_hist(symbol=symbol, period="daily", 
-                                  start_date=start_date.replace('-', ''), 
-                                  end_date=end_date.replace('-', ''), 
-                                  adjust="qfq")  # 前复权
-        elif instrument.endswith('.US') or not any(char.isdigit() for char in instrument):
-            # 美股代码（以.US结尾或全字母）或者非数字代码
-            if instrument.endswith('.US'):
-                symbol = instrument.replace('.US', '')
+    start_date, end_date = _date_str(start_date), _date_str(end_date)
+    # akshare / tushare 接口使用的紧凑日期格式 YYYYMMDD
+    sd8, ed8 = start_date.replace('-', ''), end_date.replace('-', '')
+
+    def loader():
+        import akshare as ak
+        try:
+            market, symbol = _akshare_market(instrument)
+            if market == 'us':
+                # 使用akshare的美股日线数据接口（该接口不支持日期参数，需要手动过滤）
+                df = ak.stock_us_daily(symbol=symbol, adjust="")
+                # 美股数据使用英文列名，且需按日期范围过滤
+                columns = ('date', 'open', 'close', 'high', 'low', 'volume')
+                filter_dates = True
             else:
-                symbol = instrument
-            
-            # 使用akshare的美股日线数据接口（该接口不支持日期参数，需要手动过滤）
-            df = ak.stock_us_daily(symbol=symbol, adjust="")
+                # 上证 / 深证及其他A股代码共用同一个接口
+                df = ak.stock_zh_a_hist(symbol=symbol, period="daily", 
+                                      start_date=sd8, end_date=ed8, 
+                                      adjust="qfq")  # 前复权
+                columns = ('日期', '开盘', '收盘', '最高', '最低', '成交量')
+                filter_dates = False
             
-            # 美股数据可能需要不同的列名映射
-            df = df.rename(columns={
-                'date': 'datetime',
-                'open': 'Open',
-                'close': 'Close', 
-                'high': 'High',
-                'low': 'Low',
-                'volume': 'Volume'
-            })
+            if not df.empty:
+                # 一次挑出日期与 OHLCV 列，适配backtrader格式
+                df = _ohlcv_frame(df, *columns)
+                if filter_dates:
+                    # 按日期范围过滤数据
+                    df = df[(df.index >= pd.Timestamp(start_date)) & (df.index <= pd.Timestamp(end_date))]
             
-            # 转换日期格式
-            df['datetime'] = pd.to_datetime(df['datetime'])
-            
-            # 按日期范围过滤数据
-            start_dt = pd.to_datetime(start_date)
-            end_dt = pd.to_datetime(end_date)
-            df = df[(df['datetime'] >= start_dt) & (df['datetime'] <= end_dt)]
-            
-        else:
-            # 其他类型的A股股票代码，尝试通用接口
-            df = ak.stock_zh_a_hist(symbol=instrument, period="daily", 
-                                  start_date=start_date.replace('-', ''), 
-                                  end_date=end_date.replace('-', ''), 
-                                  adjust="qfq")
-        
-        if df.empty:
-            raise ValueError(f"无法下载数据，请检查代码 {instrument} 和日期范围 {start_date} 至 {end_date} 是否正确。")
-        
-        # 重命名列以适配backtrader格式
-        df = df.rename(columns={
-            '日期': 'datetime',
-            '开盘': 'Open',
-            '收盘': 'Close', 
-            '最高': 'High',
-            '最低': 'Low',
-            '成交量': 'Volume'
-        })
-        
-        # 转换日期格式和设置索引
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df = df.set_index('datetime')
-        
-        # 选择需要的列并按时间排序
-        df = df[['Open', 'Close', 'High', 'Low', 'Volume']].sort_index()
-        
-        if return_df:
+            if df.empty:
+                raise ValueError(f"无法下载数据，请检查代码 {instrument} 和日期范围 {start_date} 至 {end_date} 是否正确。")
             return df
-        
-        df.to_csv(file_path)
-        print(f"Akshare数据已保存到: {file_path}")
-        return file_path
-        
-    except Exception as e:
-        raise Exception(f"akshare数据下载失败: {str(e)}. 请确保akshare库已正确安装。")
+            
+        except Exception as e:
+            raise Exception(f"akshare数据下载失败: {str(e)}. 请确保akshare库已正确安装。")
+
+    file_name = f"akshare_{instrument.replace('.', '_')}_{start_date}_to_{end_date}.parquet"
+    return _cached_download(file_name, loader, return_df=return_df, force_download=force_download)
 
 
 def download_tushare_data(instrument:str, start_date:str, end_date:str
@@ -144,72 +211,96 @@ def download_tushare_data(instrument:str, start_date:str, end_date:str
     返回:
         pd.DataFrame 或 str: 包含历史数据的DataFrame或文件路径
     """
-    import tushare as ts
-    # 使用绝对路径确保无论从哪个目录运行都能正确保存文件
-    current_dir = Path(os.path.abspath(__file__)).parent.parent
-    datas_dir = os.path.join(current_dir, "datas")
-    os.makedirs(datas_dir, exist_ok=True)
-    
-    if isinstance(start_date, datetime):
-       start_date = start_date.strftime('%Y-%m-%d') 
-    if isinstance(end_date, datetime):
-        end_date = end_date.strftime('%Y-%m-%d')
-    
-    file_name = f"tushare_{instrument}_{start_date[:10]}_to_{end_date[:10]}.csv"
-    file_path = os.path.join(datas_dir, file_name)
-    
-    # 如果文件已存在且不强制下载，直接返回现有文件
-    if os.path.exists(file_path) and not force_download:
-        print(f"使用现有数据文件: {file_path}")
-        if return_df:
-            df = pd.read_csv(file_path, index_col=0, parse_dates=True)
-            return df
-        return file_path
-    
-    try:
-        # 设置tushare token（可能需要先配置）
-        ts.set_token(os.getenv('TUSHARE_TOKEN'))  # 用户需要自行配置token
-        pro = ts.pro_api()
-        
-        # 根据股票代码判断市场（A股或美股）
-        if instrument.endswith('.SH') or instrument.endswith('.SZ'):
-            # 下载A股日线数据
-            df = pro.daily(ts_code=instrument, start_date=start_date.replace('-', ''), 
-                          end_date=end_date.replace('-', ''))
+    start_date, end_date = _date_str(start_date), _date_str(end_date)
+    sd8, ed8 = start_date.replace('-', ''), end_date.replace('-', '')
+
+    def loader():
+        import tushare as ts
+        try:
+            # 设置tushare token（可能需要先配置）
+            ts.set_token(os.getenv('TUSHARE_TOKEN'))  # 用户需要自行配置token
+            pro = ts.pro_api()
+            
+            # 根据股票代码判断市场（A股或美股）
+            if instrument.endswith('.SH') or instrument.endswith('.SZ'):
+                # 下载A股日线数据
+                df = pro.daily(ts_code=instrument, start_date=sd8, end_date=ed8)
+            else:
+                # 美股代码，使用 us_daily 接口
+                df = pro.us_daily(ts_code=instrument, start_date=sd8, end_date=ed8)
+            
+            if df.empty:
+                raise ValueError(f"无法下载数据，请检查代码 {instrument} 和日期范围 {start_date} 至 {end_date} 是否正确。")
+            
+            # 一次挑出日期与 OHLCV 列，适配backtrader格式（tushare 按日期倒序返回，由缓存流程统一排序）
+            return _ohlcv_frame(df, 'trade_date', 'open', 'close', 'high', 'low', 'vol')
+            
+        except Exception as e:
+            raise Exception(f"tushare数据下载失败: {str(e)}. 请确保已配置正确的tushare token。")
+
+    file_name = f"tushare_{instrument}_{start_date}_to_{end_date}.parquet"
+    return _cached_download(file_name, loader, return_df=return_df, force_download=force_download)
+
+
+def _yfinance_file_name(instrument:str, start_date:str, end_date:str) -> str:
+    """yfinance 数据的本地缓存文件名"""
+    return f"{instrument}_{_date_str(start_date)}_to_{_date_str(end_date)}.parquet"
+
+
+@functools.lru_cache(maxsize=1)
+def _yfinance_session():
+    """
+    进程内共享的 yfinance HTTP 会话，多次下载复用同一连接池与 cookie/crumb，
+    不再每次调用都重新握手。yfinance 要求使用 curl_cffi 会话
+    """
+    from curl_cffi import requests as curl_requests
+    return curl_requests.Session(impersonate="chrome")
+
+
+def _download_yfinance_bulk(instruments, start_date, end_date
+                            , proxy:str='http://localhost:7890') -> dict:
+    """
+    一次 yf.download 请求批量下载多个金融工具，yfinance 在内部按标的并发抓取，
+    整个篮子只需一次握手与 cookie/crumb 查询
+
+    返回:
+        dict: 以金融工具代码为键的 DataFrame（列为 Open/Close/High/Low/Volume）
+    """
+    import yfinance as yf
+    start_date, end_date = _date_str(start_date), _date_str(end_date)
+
+    raw = yf.download(
+        ' '.join(instruments),
+        start=start_date,
+        end=end_date,
+        auto_adjust=True,
+        threads=True,
+        group_by='ticker',
+        proxy=proxy,
+        session=_yfinance_session()
+    )
+    result = {}
+    for instrument in instruments:
+        # group_by='ticker' 时列为 (代码, 字段) 两级索引
+        df = raw.xs(instrument, axis=1, level=0) if isinstance(raw.columns, pd.MultiIndex) else raw
+        # 多个标的共用日期索引，去掉该标的没有交易的行
+        df = df.dropna(how='all')
+        # yfinance 的“坑点”：只复权了 Close， 让所有 OHLC 都复权
+        if "Adj Close" in df.columns:
+            adj_factor = (df["Adj Close"] / df["Close"]).to_numpy()[:, None]
+            # 四列价格一次广播相乘后直接构造结果，Adj Close 等多余列不再随中间结果保留
+            prices = OHLCV_COLUMNS[:4]
+            adjusted = pd.DataFrame(df[prices].to_numpy() * adj_factor, index=df.index, columns=prices)
+            adjusted['Volume'] = df['Volume'].to_numpy()
+            df = adjusted
         else:
-            # 美股代码，使用 us_daily 接口
-            df = pro.us_daily(ts_code=instrument, start_date=start_date.replace('-', ''), 
-                            end_date=end_date.replace('-', ''))
-        
-        if df.empty:
+            df = df[OHLCV_COLUMNS]
+        if len(df) == 0:
             raise ValueError(f"无法下载数据，请检查代码 {instrument} 和日期范围 {start_date} 至 {end_date} 是否正确。")
-        
-        # 重命名列以适配backtrader格式
-        df = df.rename(columns={
-            'trade_date': 'datetime',
-            'open': 'Open',
-            'close': 'Close', 
-            'high': 'High',
-            'low': 'Low',
-            'vol': 'Volume'
-        })
-        
-        # 转换日期格式
-        df['datetime'] = pd.to_datetime(df['datetime'])
-        df = df.set_index('datetime')
-        
-        # 选择需要的列并按时间排序
-        df = df[['Open', 'Close', 'High', 'Low', 'Volume']].sort_index()
-        
-        if return_df:
-            return df
-        
-        df.to_csv(file_path)
-        print(f"数据已保存到: {file_path}")
-        return file_path
-        
-    except Exception as e:
-        raise Exception(f"tushare数据下载失败: {str(e)}. 请确保已配置正确的tushare token。")
+        df.index = pd.to_datetime(df.index)
+        df.columns = list(df.columns)
+        result[instrument] = df
+    return result
 
 
 def download_yfinance_data(instrument:str, start_date:str, end_date:str
@@ -229,53 +320,85 @@ def download_yfinance_data(instrument:str, start_date:str, end_date:str
     返回:
         pd.DataFrame 或 str: 包含历史数据的DataFrame或文件路径
     """
-    # 使用绝对路径确保无论从哪个目录运行都能正确保存文件
-    current_dir = Path(os.path.abspath(__file__)).parent.parent
-    datas_dir = os.path.join(current_dir, "datas")
-    os.makedirs(datas_dir, exist_ok=True)
-    
-    if isinstance(start_date, datetime):
-       start_date = start_date.strftime('%Y-%m-%d') 
-    if isinstance(end_date, datetime):
-        end_date = end_date.strftime('%Y-%m-%d')
-    
-    file_name = f"{instrument}_{start_date[:10]}_to_{end_date[:10]}.csv"
-    file_path = os.path.join(datas_dir, file_name)
-    
-    # 如果文件已存在且不强制下载，直接返回现有文件
-    if os.path.exists(file_path) and not force_download:
-        print(f"使用现有数据文件: {file_path}")
-        if return_df:
-            df = pd.read_csv(file_path, index_col=0, parse_dates=True)
-            return df
-        return file_path
-    
-    df = yf.download(
-        instrument,
-        start=start_date,
-        end=end_date,
-        auto_adjust=True,
-        proxy=proxy
-    )
-    # yfinance 的“坑点”：只复权了 Close， 让所有 OHLC 都复权
-    if "Adj Close" in df.columns:
-        adj_factor = df["Adj Close"] / df["Close"]
-        for col in ["Open", "High", "Low", "Close"]:
-            df[col] = df[col] * adj_factor
-    df = df[["Open","Close","High","Low","Volume"]]
-    if len(df) == 0:
-        raise ValueError(f"无法下载数据，请检查代码 {instrument} 和日期范围 {start_date} 至 {end_date} 是否正确。")
-    df.index = pd.to_datetime(df.index)
-    # 清理 MultiIndex 列
-    df.columns = df.columns.get_level_values(0)
-    if return_df:
-        return df
-    
-    df.to_csv(file_path)
-    return file_path
+    def loader():
+        return _download_yfinance_bulk([instrument], start_date, end_date, proxy=proxy)[instrument]
+
+    return _cached_download(_yfinance_file_name(instrument, start_date, end_date), loader,
+                            return_df=return_df, force_download=force_download)
+
+
+_DOWNLOADERS = {
+    'akshare': download_akshare_data,
+    'tushare': download_tushare_data,
+    'yfinance': download_yfinance_data,
+}
+
+
+def download_many(instruments, start_date, end_date, source='yfinance', max_workers=16
+                  , return_df=False, force_download=False) -> dict:
+    """
+    并发下载多个金融工具的历史数据
+
+    下载函数都是阻塞的网络 I/O，用线程池并发执行，线程数即同时在途的请求上限；
+    yfinance 未缓存的标的合并为一次批量请求。每个请求超时或被限流时按指数退避最多重试 3 次。
+
+    参数:
+        instruments (list): 金融工具代码列表
+        start_date (str): 开始日期 (格式 "YYYY-MM-DD")
+        end_date (str): 结束日期 (格式 "YYYY-MM-DD")
+        source (str): 数据源，'yfinance' / 'akshare' / 'tushare'
+        max_workers (int): 最大并发请求数
+        return_df (bool): 是否直接返回DataFrame
+        force_download (bool): 是否强制重新下载，即使文件已存在
+
+    返回:
+        dict: 以金融工具代码为键，值为 DataFrame 或文件路径
+    """
+    from tenacity import retry, stop_after_attempt, wait_exponential
+
+    if source not in _DOWNLOADERS:
+        raise ValueError(f"Invalid source value: {source}. Must be one of {list(_DOWNLOADERS)}.")
+    with_retry = retry(wait=wait_exponential(), stop=stop_after_attempt(3), reraise=True)
+
+    instruments = list(dict.fromkeys(instruments))
+    if source == 'yfinance':
+        return _download_yfinance_many(instruments, start_date, end_date, with_retry(_download_yfinance_bulk),
+                                       return_df=return_df, force_download=force_download)
+
+    download = with_retry(_DOWNLOADERS[source])
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(instruments)))) as executor:
+        futures = {
+            instrument: executor.submit(download, instrument, start_date, end_date,
+                                        return_df=return_df, force_download=force_download)
+            for instrument in instruments
+        }
+        return {instrument: future.result() for instrument, future in futures.items()}
 
 
-def get_akshare_data(instrument:str, start_date:str, end_date:str, force_download=False) -> bt.feed.CSVDataBase:
+def _download_yfinance_many(instruments, start_date, end_date, download_bulk
+                            , return_df=False, force_download=False) -> dict:
+    """download_many 的 yfinance 分支：已缓存的直接读取，未缓存的合并为一次批量请求"""
+    result = {}
+    missing = []
+    for instrument in instruments:
+        if _find_snapshot(_snapshot_path(_yfinance_file_name(instrument, start_date, end_date))) and not force_download:
+            result[instrument] = download_yfinance_data(instrument, start_date, end_date, return_df=return_df)
+        else:
+            missing.append(instrument)
+
+    if missing:
+        for instrument, df in download_bulk(missing, start_date, end_date).items():
+            # 与 download_yfinance_data 一致：返回 DataFrame 时不落盘，否则写入 parquet 并返回路径
+            if return_df:
+                result[instrument] = df
+            else:
+                file_path = _snapshot_path(_yfinance_file_name(instrument, start_date, end_date))
+                _write_snapshot(df, file_path)
+                result[instrument] = file_path
+    return {instrument: result[instrument] for instrument in instruments}
+
+
+def get_akshare_data(instrument:str, start_date:str, end_date:str, force_download=False) -> bt.feeds.PandasData:
     """
     获取akshare数据并转换为backtrader数据feed
     
@@ -285,45 +408,134 @@ def get_akshare_data(instrument:str, start_date:str, end_date:str, force_downloa
         end_date (str): 结束日期
         
     返回:
-        bt.feed.CSVDataBase: backtrader数据feed
+        bt.feeds.PandasData: backtrader数据feed
     """
     try:
         fpath = download_akshare_data(instrument, start_date, end_date, force_download=force_download)
-        data = bt.feeds.GenericCSVData(dataname=fpath,
-            dtformat=("%Y-%m-%d"),
-            datetime=0,      # 第0列为日期时间
-            open=1,          # 第1列为开盘价
-            close=2,         # 第2列为收盘价
-            high=3,          # 第3列为最高价
-            low=4,           # 第4列为最低价
-            volume=5,        # 第5列为成交量
-            openinterest=-1, # 无持仓量数据
-        )
+        # 缓存中已是带日期索引的 Open/Close/High/Low/Volume 列
+        data = bt.feeds.PandasData(dataname=_read_snapshot(fpath), **_PANDAS_FEED_KWARGS)
         return data
     except Exception as e:
         raise Exception(f"获取akshare数据失败: {str(e)}")
 
 
-def get_yfinance_data(code, start_date, end_date, force_download=False)->bt.feed.CSVDataBase:
+def get_yfinance_data(code, start_date, end_date, force_download=False)->bt.feeds.PandasData:
    fpath = download_yfinance_data(code, start_date, end_date, force_download=force_download)
-   data = bt.feeds.GenericCSVData(dataname=fpath,
-        dtformat=("%Y-%m-%d"),
-        datetime=0,      # 第0列为日期时间
-        open=1,          # 第4列为开盘价
-        close=2,         # 第1列为收盘价
-        high=3,          # 第2列为最高价
-        low=4,           # 第3列为最低价
-        volume=5,        # 第5列为成交量
-        openinterest=-1, # 无持仓量数据
-    )
+   data = bt.feeds.PandasData(dataname=_read_snapshot(fpath), **_PANDAS_FEED_KWARGS)
    return data
 
 
-def get_tushare_data(instrument:str, start_date:str, end_date:str)->bt.feed.CSVDataBase:
+def cached_fetch(symbol:str, start_date, end_date, return_df=False) -> Union[bt.feeds.PandasData, pd.DataFrame]:
+    """
+    带磁盘缓存的 yfinance 数据获取，供优化器等需要反复读取同一行情的场景使用
+
+    与 download_yfinance_data 共用 datas/ 下的 parquet 快照：命中时直接读取，
+    未命中时下载并写入快照，同一标的与日期范围只下载、保存一次。
+
+    参数:
+        symbol (str): 金融工具代码 (如 "QQQ")
+        start_date (str | datetime): 开始日期
+        end_date (str | datetime): 结束日期
+        return_df (bool): 是否直接返回DataFrame
+
+    返回:
+        bt.feeds.PandasData 或 pd.DataFrame
+    """
+    # 统一日期格式，保证 str 与 datetime 入参命中同一快照
+    f, t = pd.Timestamp(start_date).strftime('%Y-%m-%d'), pd.Timestamp(end_date).strftime('%Y-%m-%d')
+    # 不带 return_df 调用，未命中时新下载的数据也会落盘
+    df = _read_snapshot(download_yfinance_data(symbol, f, t))
+
+    if return_df:
+        return df
+    return bt.feeds.PandasData(dataname=df, **_PANDAS_FEED_KWARGS)
+
+
+def cached_fetch_many(symbols, start_date, end_date) -> dict:
+    """
+    cached_fetch 的多标的版本：已有快照的直接读取，
+    缺失的标的合并为一次 yfinance 批量请求后写入同一快照目录
+
+    返回:
+        dict: 以金融工具代码为键的 DataFrame
+    """
+    f, t = pd.Timestamp(start_date).strftime('%Y-%m-%d'), pd.Timestamp(end_date).strftime('%Y-%m-%d')
+    paths = _download_yfinance_many(list(dict.fromkeys(symbols)), f, t, _download_yfinance_bulk)
+    return {symbol: _read_snapshot(path) for symbol, path in paths.items()}
+
+
+def cache_path(name:str) -> str:
+    """datas/ 目录下名为 name 的缓存文件路径，供其他模块缓存派生数据"""
+    return _snapshot_path(name)
+
+
+def write_cache(df:pd.DataFrame, file_path:str):
+    """把 DataFrame 写为 parquet 缓存文件（与行情快照相同的原子写入）"""
+    _write_snapshot(df, file_path)
+
+
+class ArrayFeed(bt.feed.DataBase):
+    """
+    由预先转换好的列数组驱动的数据源
+
+    PandasData 逐根加载时每个字段都要走一次 DataFrame.iloc，优化器每个试验都要重复一遍；
+    这里把列提前转换为 Python 列表（见 frame_columns），多个试验共享同一份只读数据，
+    每个试验只需新建一个轻量的 feed 实例。
+    """
+
+    params = (('columns', None),)
+
+    def start(self):
+        super(ArrayFeed, self).start()
+        self._idx = -1
+        cols = self.p.columns
+        self._nrows = len(cols['datetime'])
+        # 缺失的列保持 NaN，与 PandasData 一致
+        self._fields = [(getattr(self.lines, name), cols[name])
+                        for name in self.getlinealiases() if name in cols]
+
+    def _load(self):
+        self._idx += 1
+        if self._idx >= self._nrows:
+            return False
+        i = self._idx
+        for line, values in self._fields:
+            line[0] = values[i]
+        return True
+
+
+def frame_columns(df: pd.DataFrame) -> dict:
+    """把 OHLCV DataFrame 转换为 ArrayFeed 使用的列字典（列名大小写不敏感）"""
+    cols = {'datetime': [bt.date2num(ts.to_pydatetime()) for ts in df.index]}
+    lower = {str(c).lower(): c for c in df.columns}
+    for name in ('open', 'high', 'low', 'close', 'volume', 'openinterest'):
+        if name in lower:
+            cols[name] = df[lower[name]].astype(float).tolist()
+    return cols
+
+
+_FEEDS = {}
+
+
+def get_feed(symbol: str, start_date, end_date) -> ArrayFeed:
+    """
+    返回指定行情的新 feed 实例，列数据在进程内只转换一次
+
+    backtrader 回测时会修改 feed 的内部状态，因此每次调用都返回新实例，
+    仅共享底层只读的列数据。
+    """
+    key = (symbol, pd.Timestamp(start_date).strftime('%Y-%m-%d'), pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+    cols = _FEEDS.get(key)
+    if cols is None:
+        cols = _FEEDS[key] = frame_columns(cached_fetch(symbol, start_date, end_date, return_df=True))
+    return ArrayFeed(columns=cols)
+
+
+def get_tushare_data(instrument:str, start_date:str, end_date:str)->bt.feeds.PandasData:
 
     try:
         df = download_tushare_data(instrument, start_date, end_date, return_df=True)
     except Exception as e:
         raise Exception(f"获取tushare数据失败: {str(e)}")
-    data = bt.feeds.PandasData(dataname=df)
+    data = bt.feeds.PandasData(dataname=df, **_PANDAS_FEED_KWARGS)
     return data
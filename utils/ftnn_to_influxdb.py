@@ -6,6 +6,7 @@ Fetches real-time market data from FTNN plugin and stores it in InfluxDB
 
 import sys
 import os
+import re
 import json
 import socket
 import logging
@@ -16,7 +17,35 @@ import argparse
 import time
 from influxdb import DataFrameClient as dfclient
 from influxdb.exceptions import InfluxDBClientError
-from typing import List, Optional, Dict
+from typing import Optional, Dict
+
+# orjson parses the bytes from the socket directly; the stdlib json module is the fallback.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Quote request (protocol 1001); only market and stock code vary between requests
+QUOTE_REQUEST_TEMPLATE = '{"Protocol":"1001","ReqParam":{"Market":"%s","StockCode":"%s"},"Version":"1"}\n'
+
+# Codes are substituted into the template unescaped, so they must be plain alphanumerics
+_CODE_RE = re.compile(r'^[A-Za-z0-9]+$')
+
+# InfluxDB write batching: queued candles are flushed once this many rows are
+# pending or this many seconds have passed since the last flush
+BATCH_SIZE = 1000
+FLUSH_INTERVAL = 300.0
+
+# Quote polling period in seconds
+POLL_INTERVAL = 0.5
+
+# Initial capacity of the per-minute tick buffers
+TICK_BUFFER_SIZE = 256
+
+# Column types for historical CSV imports (float64 keeps prices and volumes exact in InfluxDB)
+CSV_DTYPES = {name: 'float64' for name in ('open', 'high', 'low', 'close', 'volume')}
 
 
 class FTNNTool(object):
@@ -45,14 +74,29 @@ class FTNNTool(object):
         self._ftnn_port = args.ftnn_port if args.ftnn_port else 11111
         self._market = args.market  # 1=HK, 2=US
         self._stock_code = args.stock_code
+        for name, value in (('market', self._market), ('stock code', self._stock_code)):
+            if not _CODE_RE.match(str(value)):
+                self.log.error("Invalid %s: %r", name, value)
+                sys.exit(-1)
         
         # Data aggregation settings
         self._interval = args.interval  # in seconds (60 for 1min, 300 for 5min)
-        self._tick_data = []
         self._current_minute_data = pd.DataFrame()
         
+        # Tick buffers for the current minute, reused across minutes
+        self._tick_times = np.empty(TICK_BUFFER_SIZE, dtype='datetime64[ns]')
+        self._tick_prices = np.empty(TICK_BUFFER_SIZE)
+        self._tick_volumes = np.empty(TICK_BUFFER_SIZE)
+        self._n_ticks = 0
+        
+        # Candles waiting to be written, keyed by measurement
+        self._pending = {}
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+        
         # Initialize socket connection
         self._sock = None
+        self._rfile = None
         self._connect_socket()
         
         # Initialize InfluxDB client
@@ -62,7 +106,11 @@ class FTNNTool(object):
                 self._dbport,
                 self._username, 
                 self._password,
-                self._database
+                self._database,
+                gzip=True,  # Compress write bodies; repeated field names shrink well
+                # The client keeps one requests.Session for its lifetime; a small pool is
+                # enough since flushes are sequential, and the connection stays alive between them
+                pool_size=4
             )
             self.log.info("Connected to InfluxDB at %s:%s", self._dbhost, self._dbport)
         except Exception as err:
@@ -71,16 +119,32 @@ class FTNNTool(object):
     
     def _connect_socket(self):
         """Establish socket connection to FTNN plugin"""
+        self._close_socket()
         try:
             self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self._sock.connect((self._ftnn_host, self._ftnn_port))
             self._sock.settimeout(self.timeout)
+            # Small request/response messages: send immediately and keep the idle link alive
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # Buffered reader returns one newline-terminated response per readline()
+            self._rfile = self._sock.makefile('rb', buffering=65536)
             self.log.info("Connected to FTNN plugin at %s:%s", 
                          self._ftnn_host, self._ftnn_port)
         except socket.error as err:
             self.log.error("Failed to connect to FTNN plugin: %s", err)
             sys.exit(-1)
     
+    def _close_socket(self):
+        """Close the socket and its file wrappers, if open"""
+        for f in (self._rfile, self._sock):
+            if f is not None:
+                try:
+                    f.close()
+                except OSError:
+                    pass
+        self._sock = self._rfile = None
+    
     def _send_quote_request(self, stock_code: str, market: str) -> Dict:
         """
         Send quote request to FTNN plugin
@@ -93,47 +157,41 @@ class FTNNTool(object):
             Dictionary containing quote data
         """
         # Build request according to FTNN protocol
-        req = {
-            'Protocol': '1001',
-            'ReqParam': {
-                'Market': market,
-                'StockCode': stock_code
-            },
-            'Version': '1'
-        }
-        
-        str_req = json.dumps(req) + "\n"
-        self.log.debug("Sending request: %s", str_req.strip())
+        req = QUOTE_REQUEST_TEMPLATE % (market, stock_code)
+        
+        self.log.debug("Sending request: %s", req)
         
         try:
-            self._sock.send(str_req.encode('utf-8'))
+            # sendall retries partial sends, so a busy socket cannot truncate the request
+            self._sock.sendall(req.encode('ascii'))
         except socket.error as err:
             self.log.error("Failed to send request: %s", err)
             self._connect_socket()  # Reconnect
             return None
         
-        # Receive response
-        rsp = ""
-        while True:
-            try:
-                buf = self._sock.recv(1024).decode('utf-8')
-                rsp += buf
-                
-                # Response ends with '\n'
-                if '\n' in rsp:
-                    break
-            except socket.timeout:
-                self.log.warning("Socket receive timeout")
-                return None
-            except socket.error as err:
-                self.log.error("Socket receive error: %s", err)
-                return None
-        
-        self.log.debug("Received response: %s", rsp.strip())
-        
-        # Parse response
+        # Receive response (ends with '\n')
+        try:
+            rsp = self._rfile.readline()
+        except socket.timeout:
+            # A timed-out socket file cannot be read again
+            self.log.warning("Socket receive timeout")
+            self._connect_socket()
+            return None
+        except socket.error as err:
+            self.log.error("Socket receive error: %s", err)
+            self._connect_socket()
+            return None
+        
+        if not rsp:
+            self.log.error("FTNN plugin closed the connection")
+            self._connect_socket()
+            return None
+        
+        self.log.debug("Received response: %s", rsp)
+        
+        # Parse response (trailing newline is whitespace to the parser)
         try:
-            rsp_data = json.loads(rsp.strip())
+            rsp_data = _json_loads(rsp)
             return rsp_data
         except json.JSONDecodeError as err:
             self.log.error("Failed to parse JSON response: %s", err)
@@ -182,34 +240,50 @@ class FTNNTool(object):
             self.log.error("Failed to parse quote data: %s", err)
             return None
     
-    def _aggregate_to_ohlc(self, tick_data: List[Dict], interval_minutes: int = 1) -> Optional[pd.DataFrame]:
+    def _append_tick(self, quote: Dict):
+        """Append one parsed quote to the tick buffers, doubling them when full"""
+        n = self._n_ticks
+        if n == len(self._tick_prices):
+            size = 2 * n
+            self._tick_times = np.resize(self._tick_times, size)
+            self._tick_prices = np.resize(self._tick_prices, size)
+            self._tick_volumes = np.resize(self._tick_volumes, size)
+        self._tick_times[n] = np.datetime64(quote['timestamp'], 'ns')
+        self._tick_prices[n] = quote['price']
+        self._tick_volumes[n] = float(quote['volume'])
+        self._n_ticks = n + 1
+    
+    def _aggregate_to_ohlc(self, interval_minutes: int = 1) -> Optional[pd.DataFrame]:
         """
-        Aggregate tick data to OHLC candles
+        Aggregate the buffered ticks to OHLC candles and empty the buffer
         
         Args:
-            tick_data: List of tick data dictionaries
             interval_minutes: Candle interval in minutes
             
         Returns:
             DataFrame with OHLC data
         """
-        if not tick_data:
+        n = self._n_ticks
+        if n == 0:
             return None
+        self._n_ticks = 0
         
-        # Convert to DataFrame
-        df = pd.DataFrame(tick_data)
-        df.set_index('timestamp', inplace=True)
+        times = self._tick_times[:n]
+        prices = self._tick_prices[:n]
+        volumes = self._tick_volumes[:n]
+        columns = ['open_p', 'high_p', 'low_p', 'close_p', 'volume']
         
-        # Resample to OHLC
-        ohlc = df['price'].resample(f'{interval_minutes}min').ohlc()
-        volume = df['volume'].resample(f'{interval_minutes}min').sum()
+        if interval_minutes <= 1:
+            # The buffer holds exactly one minute of ticks: one row straight from the arrays
+            index = pd.DatetimeIndex(times[:1]).floor('1min')
+            row = [[prices[0], prices.max(), prices.min(), prices[-1], volumes.sum()]]
+            return pd.DataFrame(row, index=index, columns=columns)
         
-        # Combine
-        result = ohlc.copy()
-        result['volume'] = volume
-        
-        # Rename columns to match our schema
-        result.columns = ['open_p', 'high_p', 'low_p', 'close_p', 'volume']
+        # Longer intervals keep the resample path so candles stay aligned to interval bins
+        df = pd.DataFrame({'price': prices, 'volume': volumes}, index=pd.DatetimeIndex(times))
+        result = df['price'].resample(f'{interval_minutes}min').ohlc()
+        result['volume'] = df['volume'].resample(f'{interval_minutes}min').sum()
+        result.columns = columns
         
         return result
     
@@ -220,17 +294,20 @@ class FTNNTool(object):
         Args:
             duration_minutes: How long to collect data (in minutes)
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         end_time = start_time + (duration_minutes * 60)
         
         last_minute = None
-        tick_buffer = []
+        self._n_ticks = 0
         
         self.log.info("Starting data collection for %s (Market: %s)", 
                      self._stock_code, self._market)
         self.log.info("Will collect for %d minutes", duration_minutes)
         
-        while time.time() < end_time:
+        # Requests are scheduled on a fixed grid so their latency does not add up as drift
+        next_tick = start_time
+        
+        while time.monotonic() < end_time:
             # Request quote
             rsp_data = self._send_quote_request(self._stock_code, self._market)
             
@@ -243,54 +320,75 @@ class FTNNTool(object):
                     # Check if we've moved to a new minute
                     if last_minute is not None and current_minute != last_minute:
                         # Aggregate previous minute's data
-                        if tick_buffer:
+                        if self._n_ticks:
                             self.log.info("Aggregating data for minute: %s (%d ticks)", 
-                                        last_minute, len(tick_buffer))
+                                        last_minute, self._n_ticks)
                             
-                            ohlc = self._aggregate_to_ohlc(tick_buffer, 
-                                                          interval_minutes=self._interval // 60)
+                            # Also clears the tick buffer
+                            ohlc = self._aggregate_to_ohlc(interval_minutes=self._interval // 60)
                             
                             if ohlc is not None and not ohlc.empty:
                                 self._write_to_influxdb(ohlc, self._stock_code)
-                            
-                            # Clear buffer
-                            tick_buffer = []
                     
                     # Add to buffer
-                    tick_buffer.append(quote)
+                    self._append_tick(quote)
                     last_minute = current_minute
                     
                     self.log.debug("Tick: %s - Price: %.2f", 
                                  quote['timestamp'], quote['price'])
             
-            # Sleep between requests
-            time.sleep(0.5)
+            if (self._pending_rows >= BATCH_SIZE
+                    or time.monotonic() - self._last_flush > FLUSH_INTERVAL):
+                self._flush_influxdb()
+            
+            # Sleep until the next scheduled request; after a long stall (e.g. a receive
+            # timeout) restart the grid instead of firing the missed requests back to back
+            next_tick += POLL_INTERVAL
+            now = time.monotonic()
+            if next_tick < now:
+                next_tick = now
+            time.sleep(next_tick - now)
         
         # Process remaining data
-        if tick_buffer:
-            self.log.info("Processing final buffer (%d ticks)", len(tick_buffer))
-            ohlc = self._aggregate_to_ohlc(tick_buffer, 
-                                          interval_minutes=self._interval // 60)
+        if self._n_ticks:
+            self.log.info("Processing final buffer (%d ticks)", self._n_ticks)
+            ohlc = self._aggregate_to_ohlc(interval_minutes=self._interval // 60)
             if ohlc is not None and not ohlc.empty:
                 self._write_to_influxdb(ohlc, self._stock_code)
+        self._flush_influxdb()
         
         self.log.info("Data collection completed")
     
     def _write_to_influxdb(self, df: pd.DataFrame, measurement: str):
         """
-        Write DataFrame to InfluxDB
+        Queue a DataFrame for writing to InfluxDB
+        
+        Rows are sent by _flush_influxdb in one request per measurement
+        instead of one HTTP round-trip per candle.
         
         Args:
             df: DataFrame with OHLC data
             measurement: Measurement name (usually ticker symbol)
         """
-        try:
-            self.log.info("Writing %d records to InfluxDB (measurement: %s)", 
-                         len(df), measurement)
-            self.dfdb.write_points(df, measurement)
-            self.log.info("Successfully wrote data to InfluxDB")
-        except InfluxDBClientError as err:
-            self.log.error('Failed to write to InfluxDB: %s', err)
+        self._pending.setdefault(measurement, []).append(df)
+        self._pending_rows += len(df)
+    
+    def _flush_influxdb(self):
+        """Write all queued DataFrames to InfluxDB"""
+        pending, self._pending = self._pending, {}
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+        
+        for measurement, frames in pending.items():
+            combined = frames[0] if len(frames) == 1 else pd.concat(frames)
+            try:
+                self.log.info("Writing %d records to InfluxDB (measurement: %s)", 
+                             len(combined), measurement)
+                self.dfdb.write_points(combined, measurement, batch_size=5000,
+                                       protocol='line', time_precision='s')
+                self.log.info("Successfully wrote data to InfluxDB")
+            except InfluxDBClientError as err:
+                self.log.error('Failed to write to InfluxDB: %s', err)
     
     def get_historical_data_from_csv(self, csv_file: str):
         """
@@ -304,10 +402,8 @@ class FTNNTool(object):
             return
         
         try:
-            df = pd.read_csv(csv_file, index_col=0)
-            
-            # Parse index as datetime
-            df.index = pd.to_datetime(df.index)
+            # Parse the index as datetime and the price columns as floats in one pass
+            df = pd.read_csv(csv_file, index_col=0, parse_dates=True, dtype=CSV_DTYPES)
             
             # Rename columns if needed
             column_mapping = {
@@ -320,6 +416,7 @@ class FTNNTool(object):
             
             # Write to InfluxDB
             self._write_to_influxdb(df, self._stock_code)
+            self._flush_influxdb()
             
             self.log.info("Successfully imported %d records from %s", 
                          len(df), csv_file)
@@ -329,8 +426,9 @@ class FTNNTool(object):
     
     def close(self):
         """Clean up resources"""
+        self._flush_influxdb()
         if self._sock:
-            self._sock.close()
+            self._close_socket()
             self.log.info("Closed FTNN socket connection")
 
 
@@ -0,0 +1,97 @@
+import math
+from collections import deque
+
+import backtrader as bt
+
+
+class IncrementalSMAStd(bt.Indicator):
+    """
+    滚动均值与总体标准差（与 bt.ind.SMA / bt.ind.StdDev 同口径）
+
+    维护窗口内的累加和与平方和，每根K线 O(1) 更新，
+    替代 SMA + StdDev 两个指标每根K线各自重扫整个窗口。
+    """
+
+    lines = ("sma", "std")
+    params = (("period", 20),)
+
+    def __init__(self):
+        self.addminperiod(self.params.period)
+        self._buf = deque(maxlen=self.params.period)
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def _push(self):
+        x = self.data[0]
+        # 上游指标预热期的 NaN 不进入窗口，避免污染累加和
+        if x != x:
+            return
+        if len(self._buf) == self.params.period:
+            old = self._buf[0]
+            self._sum -= old
+            self._sumsq -= old * old
+        self._buf.append(x)
+        self._sum += x
+        self._sumsq += x * x
+
+    def prenext(self):
+        self._push()
+
+    def next(self):
+        self._push()
+        n = self.params.period
+        mean = self._sum / n
+        self.lines.sma[0] = mean
+        self.lines.std[0] = math.sqrt(max(self._sumsq / n - mean * mean, 0.0))
+
+
+class IncrementalOLSTransform(bt.Indicator):
+    """
+    窗口 OLS 残差：data0 - (alpha + beta * data1)
+
+    与 bt.ind.OLS_TransformationN 的 spread 线同口径，但窗口内的 Σx、Σy、Σxy、Σx²
+    增量维护，每根K线 O(1) 更新，也不再依赖 pandas / statsmodels 逐根拟合。
+    """
+
+    _mindatas = 2
+    lines = ("resid",)
+    params = (("period", 10),)
+
+    def __init__(self):
+        self.addminperiod(self.params.period)
+        self._xs = deque(maxlen=self.params.period)
+        self._ys = deque(maxlen=self.params.period)
+        self._sx = 0.0
+        self._sy = 0.0
+        self._sxy = 0.0
+        self._sxx = 0.0
+
+    def _push(self):
+        x = self.data1[0]
+        y = self.data0[0]
+        if len(self._xs) == self.params.period:
+            xo = self._xs[0]
+            yo = self._ys[0]
+            self._sx -= xo
+            self._sy -= yo
+            self._sxy -= xo * yo
+            self._sxx -= xo * xo
+        self._xs.append(x)
+        self._ys.append(y)
+        self._sx += x
+        self._sy += y
+        self._sxy += x * y
+        self._sxx += x * x
+        return x, y
+
+    def prenext(self):
+        self._push()
+
+    def next(self):
+        x, y = self._push()
+        n = self.params.period
+        den = n * self._sxx - self._sx * self._sx
+        # 窗口内 x 恒定时退化为常数拟合
+        beta = (n * self._sxy - self._sx * self._sy) / den if den else 0.0
+        alpha = (self._sy - beta * self._sx) / n
+        self.lines.resid[0] = y - (alpha + beta * x)
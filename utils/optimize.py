@@ -1,14 +1,32 @@
+import logging
+import multiprocessing
+
 import backtrader as bt
 import numpy as np
 from scipy.optimize import differential_evolution
 
+from utils.fetch_data import ArrayFeed, frame_columns
+
+# 工作进程内的逐次评估信息走 logging（默认不输出），进度只由主进程回调打印
+log = logging.getLogger('optimize')
+
 
 class NormalizedMultiObjectiveOptimizer:
     """多目标优化器 - 使用Min-Max归一化"""
     
-    def __init__(self, data, initial_cash=100000):
-        self.data = data
+    def __init__(self, data, initial_cash=100000, strategy=None, evaluator=None):
+        # 行情在构造时一次转换为列数组，所有评估共享；列数组可直接 pickle 到并行工作进程
+        df = data.p.dataname if isinstance(data, bt.feeds.PandasData) else data
+        self._columns = frame_columns(df)
         self.initial_cash = initial_cash
+        # 接受 fast_period / slow_period / rsi_period 参数的策略类
+        self.strategy = strategy
+        # 可选的快速评估函数 evaluator(close, fast, slow, rsi) -> (sharpe, 年化收益率%, 最大回撤%)，
+        # 如 utils.fast_backtest.evaluate；设置后差分进化内循环不再运行 cerebro，最终参数应以完整回测确认
+        self.evaluator = evaluator
+        self._close = np.asarray(self._columns['close'], dtype=np.float64)
+        # 取整后相同的参数组合只回测一次；缓存只在主进程维护，并行评估前先按缓存去重
+        self._cache = {}
         
         # 定义各指标的合理范围（根据实际情况调整）
         self.sharpe_range = (-1, 3)
@@ -27,89 +45,132 @@ class NormalizedMultiObjectiveOptimizer:
         normalized = (value - min_val) / (max_val - min_val)
         return np.clip(normalized, 0, 1)
     
+    def __getstate__(self):
+        # 发往工作进程时不携带缓存：工作进程内的副本用完即弃，缓存由主进程的 _dedup_map 填充
+        state = self.__dict__.copy()
+        state['_cache'] = {}
+        return state
+    
     def objective_function(self, params):
         """归一化的目标函数"""
-        fast_period, slow_period, rsi_period = [int(x) for x in params]
+        key = tuple(int(x) for x in params)
+        if key not in self._cache:
+            self._cache[key] = self._evaluate(*key)
+        return self._cache[key]
+    
+    def _dedup_map(self, pool_map):
+        """
+        包装进程池的 map 作为 differential_evolution 的 workers
         
+        每代候选先取整，只把缓存中没有的参数组合分发给进程池评估，结果写回主进程缓存
+        """
+        def mapper(func, candidates):
+            keys = [tuple(int(x) for x in params) for params in candidates]
+            missing = [key for key in dict.fromkeys(keys) if key not in self._cache]
+            if missing:
+                self._cache.update(zip(missing, pool_map(func, missing)))
+            return [self._cache[key] for key in keys]
+        return mapper
+    
+    def _evaluate(self, fast_period, slow_period, rsi_period):
+        """回测一组整数参数并返回 -综合得分"""
         # 参数有效性检查
         if fast_period >= slow_period or fast_period < 5 or rsi_period < 5:
             return 1e6
         
         try:
-            cerebro = bt.Cerebro()
-            cerebro.addstrategy(
-                MultiObjectiveStrategy,
-                fast_period=fast_period,
-                slow_period=slow_period,
-                rsi_period=rsi_period
-            )
-            cerebro.adddata(self.data)
-            cerebro.broker.setcash(self.initial_cash)
-            cerebro.broker.setcommission(commission=0.001)
-            
-            # 添加分析器
-            cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe', 
-                              timeframe=bt.TimeFrame.Days, annualize=True, riskfreerate=0.02)
-            cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
-            cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
-            
-            result = cerebro.run()
-            
-            # 提取指标
-            sharpe = result[0].analyzers.sharpe.get_analysis().get('sharperatio')
-            sharpe = 0 if sharpe is None else float(sharpe)
-            
-            returns_analysis = result[0].analyzers.returns.get_analysis()
-            annual_return = returns_analysis.get('rnorm100', 0)
-            annual_return = 0 if annual_return is None else float(annual_return)
-            
-            drawdown_analysis = result[0].analyzers.drawdown.get_analysis()
-            max_dd = abs(drawdown_analysis.get('max', {}).get('drawdown', 100))
-            
-            # 归一化各指标
-            sharpe_norm = self.normalize_value(sharpe, *self.sharpe_range)
-            return_norm = self.normalize_value(annual_return, *self.return_range)
-            dd_norm = self.normalize_value(
-                self.dd_range[1] - max_dd,  # 回撤越小越好
-                0, 
-                self.dd_range[1]
-            )
-            
-            # 计算综合得分
-            score = (
-                self.weights['sharpe'] * sharpe_norm +
-                self.weights['return'] * return_norm +
-                self.weights['drawdown'] * dd_norm
-            )
-            
-            # 打印调试信息
-            print(f"参数: fast={fast_period}, slow={slow_period}, rsi={rsi_period}")
-            print(f"  原始值: Sharpe={sharpe:.3f}, Return={annual_return:.2f}%, DD={max_dd:.2f}%")
-            print(f"  归一化: Sharpe={sharpe_norm:.3f}, Return={return_norm:.3f}, DD={dd_norm:.3f}")
-            print(f"  综合得分: {score:.4f}\n")
-            
-            return -score  # 最大化score = 最小化-score
-            
+            if self.evaluator is not None:
+                # 快速路径：直接在收盘价数组上计算三个指标，不经过 cerebro
+                sharpe, annual_return, max_dd = self.evaluator(
+                    self._close, fast_period, slow_period, rsi_period)
+            else:
+                sharpe, annual_return, max_dd = self._run_backtest(
+                    fast_period, slow_period, rsi_period)
         except Exception as e:
-            print(f"策略运行出错: {e}")
+            log.warning("策略运行出错: %s", e)
             return 1e6
+        
+        # 归一化各指标
+        sharpe_norm = self.normalize_value(sharpe, *self.sharpe_range)
+        return_norm = self.normalize_value(annual_return, *self.return_range)
+        dd_norm = self.normalize_value(
+            self.dd_range[1] - max_dd,  # 回撤越小越好
+            0, 
+            self.dd_range[1]
+        )
+        
+        # 计算综合得分
+        score = (
+            self.weights['sharpe'] * sharpe_norm +
+            self.weights['return'] * return_norm +
+            self.weights['drawdown'] * dd_norm
+        )
+        
+        log.debug("params %s score %.4f", (fast_period, slow_period, rsi_period), score)
+        return -score  # 最大化score = 最小化-score
+    
+    def _run_backtest(self, fast_period, slow_period, rsi_period):
+        """完整 cerebro 回测，返回 (夏普比率, 年化收益率%, 最大回撤%)"""
+        cerebro = bt.Cerebro()
+        cerebro.addstrategy(
+            self.strategy,
+            fast_period=fast_period,
+            slow_period=slow_period,
+            rsi_period=rsi_period
+        )
+        # 每次评估只新建轻量 feed，不再逐根经 DataFrame.iloc 重新加载行情
+        cerebro.adddata(ArrayFeed(columns=self._columns))
+        cerebro.broker.setcash(self.initial_cash)
+        cerebro.broker.setcommission(commission=0.001)
+        
+        # 添加分析器
+        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe', 
+                          timeframe=bt.TimeFrame.Days, annualize=True, riskfreerate=0.02)
+        cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
+        cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
+        
+        result = cerebro.run()
+        
+        # 提取指标
+        sharpe = result[0].analyzers.sharpe.get_analysis().get('sharperatio')
+        sharpe = 0 if sharpe is None else float(sharpe)
+        
+        returns_analysis = result[0].analyzers.returns.get_analysis()
+        annual_return = returns_analysis.get('rnorm100', 0)
+        annual_return = 0 if annual_return is None else float(annual_return)
+        
+        drawdown_analysis = result[0].analyzers.drawdown.get_analysis()
+        max_dd = abs(drawdown_analysis.get('max', {}).get('drawdown', 100))
+        return sharpe, annual_return, max_dd
     
     def optimize(self, bounds=None):
         """执行优化"""
         if bounds is None:
             raise ValueError("必须提供参数边界(bounds)进行优化。")
+        if self.strategy is None and self.evaluator is None:
+            raise ValueError("必须提供策略类(strategy)或快速评估函数(evaluator)进行优化。")
         
         print("开始多目标优化（归一化版本）...")
         print(f"权重配置: {self.weights}")
         print(f"指标范围: Sharpe{self.sharpe_range}, Return{self.return_range}, DD{self.dd_range}\n")
         
-        result = differential_evolution(
-            self.objective_function,
-            bounds,
-            maxiter=30,
-            popsize=10,
-            seed=42,
-            polish=False
-        )
+        with multiprocessing.Pool() as pool:
+            result = differential_evolution(
+                self.objective_function,
+                bounds,
+                maxiter=30,
+                popsize=10,
+                seed=42,
+                polish=False,
+                # 每代种群去重后分发到全部 CPU 并行评估，整代评估完再统一更新
+                workers=self._dedup_map(pool.map),
+                updating='deferred',
+                callback=self._log_generation
+            )
         
-        return result
\ No newline at end of file
+        return result
+    
+    def _log_generation(self, xk, convergence=None):
+        """每代结束后在主进程打印当前最优参数（工作进程内不再逐次打印）"""
+        fast_period, slow_period, rsi_period = [int(x) for x in xk]
+        print(f"当前最优: fast={fast_period}, slow={slow_period}, rsi={rsi_period}, 收敛度={convergence}")
\ No newline at end of file
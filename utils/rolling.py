@@ -0,0 +1,48 @@
+import numpy as np
+
+
+def rolling_mean(a, window):
+    """
+    基于累加和的滚动均值，O(N) 一次性计算
+
+    参数:
+        a: 一维价格序列
+        window: 滚动窗口长度
+
+    返回:
+        与输入等长的 float64 数组，前 window-1 个位置为 NaN，与 backtrader 的 SMA 逐根对齐
+    """
+    a = np.asarray(a, dtype=np.float64)
+    mean = np.full(a.shape, np.nan)
+    if len(a) < window:
+        return mean
+
+    csum = np.cumsum(np.concatenate(([0.0], a)))
+    mean[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return mean
+
+
+def rolling_mean_std(a, window):
+    """
+    基于累加和的滚动均值与总体标准差，O(N) 一次性计算
+
+    参数:
+        a: 一维价格序列
+        window: 滚动窗口长度
+
+    返回:
+        (mean, std): 与输入等长的 float64 数组，前 window-1 个位置为 NaN，
+        与 backtrader 的 SMA / StdDev 指标逐根对齐
+    """
+    a = np.asarray(a, dtype=np.float64)
+    mean = rolling_mean(a, window)
+    std = np.full(a.shape, np.nan)
+    if len(a) < window:
+        return mean, std
+
+    csum2 = np.cumsum(np.concatenate(([0.0], a * a)))
+    m = mean[window - 1:]
+    var = (csum2[window:] - csum2[:-window]) / window - m * m
+    # 浮点误差可能导致方差出现极小的负数
+    std[window - 1:] = np.sqrt(np.maximum(var, 0.0))
+    return mean, std
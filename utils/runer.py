@@ -1,7 +1,7 @@
 
 import backtrader as bt
 from typing import List, Text, Union
-from utils.fetch_data import get_yfinance_data
+from utils.fetch_data import cached_fetch_many
 from .synthetic_data import get_aligned_synthetic_data
 
 
@@ -10,11 +10,13 @@ def run_strategy(strategy, strategy_args={},
                  symbol:Union[List[Text], Text]='INTC', 
                  start_date='2023-01-01', end_date='2024-06-30',
                  initial_cash = 10000.0, commission=0.001,
-                 sizer=None, sizer_params={}):
+                 sizer=None, sizer_params={}, stdstats=True):
     """运行advisory信号策略演示"""
     print("=== LLM Advisory 信号交易策略演示 ===")
     
-    cerebro = bt.Cerebro()
+    # 策略在 __init__ 中基于预加载的整段行情预计算信号，需保持 preload/runonce 开启
+    # （exactbars 会关闭预加载且无法绘图，因此不启用）；默认观察器只在绘图时需要
+    cerebro = bt.Cerebro(preload=True, runonce=True, stdstats=stdstats)
     
     # 设置初始参数
     
@@ -27,17 +29,14 @@ def run_strategy(strategy, strategy_args={},
         symbols = symbol
     else:
         symbols = [symbol]
-    datas = []
-    for sym in symbols:
-        data = get_yfinance_data(sym, start_date, end_date)
-        datas.append(data)
+    # 行情经 parquet 磁盘缓存读取，未缓存的标的合并为一次批量下载；合成数据直接复用同一份 DataFrame
+    frames = cached_fetch_many(symbols, start_date, end_date)
+    dfs = [frames[sym] for sym in symbols]
+    datas = [bt.feeds.PandasData(dataname=df) for df in dfs]
         
     if len(symbols) == 2 and symbols[0] == 'QQQ':
         # 获取 DataFrame 数据进行合成
-        from utils.fetch_data import download_yfinance_data
-        qqq_df = download_yfinance_data(symbols[0], start_date, end_date, return_df=True)
-        tqqq_df = download_yfinance_data(symbols[1], start_date, end_date, return_df=True)
-        synthetic_df = get_aligned_synthetic_data(qqq_df, tqqq_df)
+        synthetic_df = get_aligned_synthetic_data(dfs[0], dfs[1])
         
         # 将合成后的 DataFrame 转换回 backtrader 数据格式
         datas[1] = bt.feeds.PandasData(dataname=synthetic_df)
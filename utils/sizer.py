@@ -24,16 +24,14 @@ class PercentSizer(bt.Sizer):
         ('percents', 20),  # 默认使用20%的资金
     )
     
+    def __init__(self):
+        # 资金比例在构造时算好；上限 100% 保证不超过最大可买数量，每根K线无需再取 min
+        self._fraction = min(self.p.percents, 100) / 100
+    
     def _getsizing(self, comminfo, cash, data, isbuy):
         if isbuy:
             # 计算买入数量
-            price = data.close[0]
-            position_value = cash * (self.p.percents / 100)
-            size = int(position_value / price)
-            
-            # 确保size为正数且不超过最大可买数量
-            max_size = int(cash / price)
-            return min(size, max_size)
+            return int(cash * self._fraction / data.close[0])
         else:
             # 卖出时使用全部持仓
             return self.broker.getposition(data).size
@@ -50,20 +48,21 @@ class RiskAwareSizer(bt.Sizer):
         ('stop_loss_pct', 0.05),   # 止损5%
     )
     
+    def __init__(self):
+        # 每股风险 = price * stop_loss_pct，头寸 = cash * risk_per_trade / 每股风险；
+        # 两个参数的比值在构造时算好，每根K线只剩一次乘除
+        if self.p.stop_loss_pct > 0:
+            self._risk_x_loss = self.p.risk_per_trade / self.p.stop_loss_pct
+        else:
+            self._risk_x_loss = None
+    
     def _getsizing(self, comminfo, cash, data, isbuy):
         if isbuy:
             price = data.close[0]
-            if price <= 0 or cash <= 0 or self.p.stop_loss_pct <= 0:
-                return 0
-                
-            stop_price = price * (1 - self.p.stop_loss_pct)
-            risk_per_share = price - stop_price
-            
-            if risk_per_share <= 0:
+            if price <= 0 or cash <= 0 or self._risk_x_loss is None:
                 return 0
                 
-            position_size = (cash * self.p.risk_per_trade) / risk_per_share
-            return max(0, int(position_size))
+            return max(0, int(cash * self._risk_x_loss / price))
         else:
             position = self.broker.getposition(data)
             return position.size if position else 0
\ No newline at end of file
@@ -1,6 +1,25 @@
+import hashlib
+import os
+
 import pandas as pd
 import numpy as np
 
+from .fetch_data import cache_path, write_cache
+
+
+def _synthetic_cache_path(qqq_df, tqqq_df, annual_expense):
+    """
+    合成结果的 parquet 缓存文件
+
+    以两条行情全部内容（含日期索引）的逐行哈希和损耗率的 sha256 为文件名：
+    区间中间的历史数据被修订（如拆股、分红复权）时缓存随之失效
+    """
+    h = hashlib.sha256(repr(annual_expense).encode())
+    for df in (qqq_df, tqqq_df):
+        h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return cache_path(f"synthetic_{h.hexdigest()}.parquet")
+
+
 def get_aligned_synthetic_data(qqq_df, tqqq_df, annual_expense=0.02):
     """
     输入 QQQ 和 TQQQ 的原始数据，返回 1999 年至今的合成+真实数据
@@ -25,23 +44,38 @@ def get_aligned_synthetic_data(qqq_df, tqqq_df, annual_expense=0.02):
     qqq_df.sort_index(inplace=True)
     tqqq_df.sort_index(inplace=True)
 
+    # 相同输入的合成结果只计算一次，重复回测 / 参数优化直接读取缓存
+    file_path = _synthetic_cache_path(qqq_df, tqqq_df, annual_expense)
+    if os.path.exists(file_path):
+        return pd.read_parquet(file_path)
+    final_df = _build_synthetic(qqq_df, tqqq_df, annual_expense)
+    write_cache(final_df, file_path)
+    return final_df
+
+
+def _build_synthetic(qqq_df, tqqq_df, annual_expense):
+    """在已排序的行情上拼接合成期与真实 TQQQ，并对齐到 QQQ 时间轴"""
     # 1. 确定真实 TQQQ 的起始日期
     real_start_date = tqqq_df.index[0]
     
     # 2. 提取 TQQQ 上市之前的 QQQ 数据进行拟合
-    synthetic_period = qqq_df[qqq_df.index < real_start_date].copy()
+    synthetic_period = qqq_df[qqq_df.index < real_start_date]
     
     if synthetic_period.empty:
         return tqqq_df.reindex(qqq_df.index)  # 如果没有拟合期，直接返回 TQQQ 数据对齐后的结果
     
-    # 计算 QQQ 每日收益率
-    qqq_returns = synthetic_period['Close'].pct_change()
+    # 拟合期的 OHLC 一次取为连续的 float64 数组，后续全部在 NumPy 上完成
+    ohlc_columns = ['Open', 'High', 'Low', 'Close']
+    arr = synthetic_period[ohlc_columns].to_numpy(dtype=np.float64, copy=True)
+    close = arr[:, 3].copy()
     
     # 计算每日分摊的 2% 损耗 (依据来源 [2] 的严谨性要求)
     daily_loss = (1 + annual_expense) ** (1/252) - 1
     
-    # 合成 TQQQ 每日收益率 = QQQ收益率 * 3 - 每日损耗
-    synthetic_returns = (qqq_returns * 3) - daily_loss
+    # 合成 TQQQ 每日收益率 = QQQ收益率 * 3 - 每日损耗；首日没有收益率，记为 0
+    synthetic_returns = np.empty_like(close)
+    synthetic_returns[0] = 0.0
+    synthetic_returns[1:] = (close[1:] / close[:-1] - 1) * 3 - daily_loss
     
     # 3. 为了让曲线无缝衔接，以真实 TQQQ 上市首日的价格为基准，逆向推算早期价格
     # 初始价格设为真实 TQQQ 第一天的开盘价
@@ -49,20 +83,14 @@ def get_aligned_synthetic_data(qqq_df, tqqq_df, annual_expense=0.02):
     
     # 逆向累乘计算价格序列
     # 我们先正向计算累计收益，然后根据 real_start_date 的价格进行缩放
-    cum_ret = (1 + synthetic_returns.fillna(0)).cumprod()
-    scaling_factor = base_price / cum_ret.iloc[-1]
-    
-    synthetic_prices = cum_ret * scaling_factor
+    cum_ret = np.cumprod(1 + synthetic_returns)
+    synthetic_prices = cum_ret * (base_price / cum_ret[-1])
     
     # 4. 构建拟合阶段的 DataFrame
-    synthetic_df = pd.DataFrame(index=synthetic_period.index)
-    synthetic_df['Close'] = synthetic_prices
-    # 简化模拟 OHLC (保持比例一致)
-    ratio = synthetic_df['Close'] / synthetic_period['Close']
-    synthetic_df['Open'] = synthetic_period['Open'] * ratio
-    synthetic_df['High'] = synthetic_period['High'] * ratio
-    synthetic_df['Low'] = synthetic_period['Low'] * ratio
-    synthetic_df['Volume'] = synthetic_period['Volume'] # 成交量沿用 QQQ 仅作参考
+    # 简化模拟 OHLC (保持比例一致)：四列一次广播缩放，Close 即为合成价格
+    arr *= (synthetic_prices / close)[:, None]
+    synthetic_df = pd.DataFrame(arr, index=synthetic_period.index, columns=ohlc_columns)
+    synthetic_df['Volume'] = synthetic_period['Volume'].to_numpy() # 成交量沿用 QQQ 仅作参考
 
     # 5. 合并拟合数据与真实数据 [1]
     # 拼接 2010 年以前的合成数据和 2010 年以后的真实 TQQQ 数据
@@ -70,4 +98,4 @@ def get_aligned_synthetic_data(qqq_df, tqqq_df, annual_expense=0.02):
     
     # 6. 与 QQQ 时间轴完全对齐
     final_df = full_tqqq.reindex(qqq_df.index)
-    return final_df
\ No newline at end of file
+    return final_df
@@ -1,206 +1,375 @@
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
+import collections
+import functools
+import sys
+
+import matplotlib
 import numpy as np
+from PIL import Image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.patches import Patch
+
+# 中文字体只在第一次绘图时设置，只使用报告函数时不修改全局 rcParams
+_FONT_SET = False
+
+def _setup_fonts():
+    """设置中文字体（只执行一次）"""
+    global _FONT_SET
+    if not _FONT_SET:
+        matplotlib.rcParams['font.sans-serif'] = ['SimHei']  # 用来正常显示中文标签
+        matplotlib.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
+        _FONT_SET = True
+
+# 标题与标签共用的字体对象，所有文字复用同一实例，不再各自按 rcParams 解析字体
+_FP_TITLE = FontProperties(family='SimHei', size=12)
+_FP_LABEL = FontProperties(family='SimHei', size=10)
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei']  # 用来正常显示中文标签
-plt.rcParams['axes.unicode_minus'] = False  # 用来正常显示负号
+# 图表与文字报告共用的交易统计，由 derive_trade_stats 从分析结果一次取出并算好派生值；
+# 可哈希，同时作为报告格式化缓存的键
+TradeStats = collections.namedtuple('TradeStats', [
+    'total', 'closed', 'open_n', 'won_n', 'lost_n',
+    'gross', 'net', 'gross_avg', 'net_avg', 'won_total', 'lost_total',
+    'long_n', 'short_n', 'long_won', 'long_lost', 'short_won', 'short_lost',
+    'avg_hold', 'max_hold', 'min_hold', 'won_avg_hold', 'lost_avg_hold',
+    'won_avg', 'lost_avg_abs', 'won_max', 'lost_max_abs',
+    'won_streak', 'lost_streak', 'cur_won', 'cur_lost',
+    'win_rate', 'pnl_ratio',
+])
 
-def visualize_trade_analyzer(trade_data):
+# 尚无已平仓交易时的统计：计数与金额为 0，胜率与盈亏比无意义
+_EMPTY_STATS = TradeStats(*[0] * len(TradeStats._fields))._replace(win_rate=None, pnl_ratio=None)
+
+def derive_trade_stats(trade_data):
     """
-    可视化交易分析器数据
+    从 TradeAnalyzer 结果中取出图表与报告所需的全部数值
     
     Args:
         trade_data: TradeAnalyzer的get_analysis()结果，可以是AutoOrderedDict或字典
-    """
-    trade_dict = {}
-    if isinstance(trade_data, dict):
-        trade_dict = trade_data
-    else:
-        trade_dict = trade_data.to_dict()
-    
-    # 创建图形布局
-    fig = plt.figure(figsize=(16, 12))
-    gs = gridspec.GridSpec(3, 2, figure=fig)
-    
-    # 1. 总体交易统计
-    ax1 = fig.add_subplot(gs[0, 0])
-    total_trades = trade_dict['total']['total']
-    won_trades = trade_dict['won']['total']
-    lost_trades = trade_dict['lost']['total']
-    open_trades = trade_dict['total']['open']
-    
-    labels = ['盈利交易', '亏损交易', '未平仓交易']
-    sizes = [won_trades, lost_trades, open_trades]
-    colors = ['#2ecc71', '#e74c3c', '#f39c12']
-    
-    ax1.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
-    ax1.set_title(f'交易分布 (总计: {total_trades} 笔)')
-    
-    # 2. 盈亏金额统计
-    ax2 = fig.add_subplot(gs[0, 1])
-    gross_pnl = trade_dict['pnl']['gross']['total']
-    net_pnl = trade_dict['pnl']['net']['total']
     
-    categories = ['毛利', '净利']
-    values = [gross_pnl, net_pnl]
-    colors_bar = ['#3498db', '#9b59b6']
-    
-    bars = ax2.bar(categories, values, color=colors_bar)
-    ax2.set_title('盈亏金额统计')
-    ax2.set_ylabel('金额')
-    
-    # 在柱状图上添加数值标签
-    for bar, value in zip(bars, values):
-        height = bar.get_height()
-        ax2.text(bar.get_x() + bar.get_width()/2., height,
-                f'{value:,.2f}', ha='center', va='bottom')
-    
-    # 3. 多空交易统计
-    ax3 = fig.add_subplot(gs[1, 0])
-    long_trades = trade_dict['long']['total']
-    short_trades = trade_dict['short']['total']
-    long_won = trade_dict['long']['won']
-    long_lost = trade_dict['long']['lost']
-    
-    long_data = [long_won, long_lost]
-    short_data = [trade_dict['short']['won'], trade_dict['short']['lost']]
-    
-    x = np.arange(2)
-    width = 0.35
-    
-    bars1 = ax3.bar(x - width/2, long_data, width, label='多头', color='#3498db')
-    bars2 = ax3.bar(x + width/2, short_data, width, label='空头', color='#e74c3c')
-    
-    ax3.set_xlabel('交易结果')
-    ax3.set_ylabel('交易数量')
-    ax3.set_title('多空交易统计')
-    ax3.set_xticks(x)
-    ax3.set_xticklabels(['盈利', '亏损'])
-    ax3.legend()
-    
-    # 4. 持仓时间分析
-    ax4 = fig.add_subplot(gs[1, 1])
-    avg_hold = trade_dict['len']['average']
-    max_hold = trade_dict['len']['max']
-    min_hold = trade_dict['len']['min']
-    
-    hold_stats = ['平均持仓', '最长持仓', '最短持仓']
-    hold_values = [avg_hold, max_hold, min_hold]
+    Returns:
+        TradeStats；win_rate 为百分比，无已平仓交易时为 None；pnl_ratio 无亏损金额时为 None
+    """
+    # AutoOrderedDict 与 dict 都支持逐层下标访问，只有不支持下标的对象才需要 to_dict()
+    data = trade_data if hasattr(trade_data, '__getitem__') else trade_data.to_dict()
     
-    bars = ax4.bar(hold_stats, hold_values, color=['#f39c12', '#e67e22', '#d35400'])
-    ax4.set_title('持仓时间统计')
-    ax4.set_ylabel('周期数')
+    # 尚无已平仓交易时 TradeAnalyzer 只有 total 一项，won/lost/pnl 等子树都不存在；
+    # 用 get 读取：AutoOrderedDict 下标访问缺失的键会新建空节点而不是返回 0
+    total = data['total']
+    closed = total.get('closed', 0)
+    if not closed:
+        return _EMPTY_STATS._replace(total=total.get('total', 0), open_n=total.get('open', 0))
     
-    for bar, value in zip(bars, hold_values):
-        height = bar.get_height()
-        ax4.text(bar.get_x() + bar.get_width()/2., height,
-                f'{value:.1f}', ha='center', va='bottom')
+    # 各子字典先取出一次
+    won, lost, pnl, length = data['won'], data['lost'], data['pnl'], data['len']
+    long_, short_ = data['long'], data['short']
+    won_streak, lost_streak = data['streak']['won'], data['streak']['lost']
+    won_total, lost_total = won['pnl']['total'], lost['pnl']['total']
     
-    # 5. 盈亏分布
-    ax5 = fig.add_subplot(gs[2, 0])
-    won_pnl_avg = trade_dict['won']['pnl']['average']
-    lost_pnl_avg = trade_dict['lost']['pnl']['average']
-    won_pnl_max = trade_dict['won']['pnl']['max']
-    lost_pnl_max = trade_dict['lost']['pnl']['max']
+    return TradeStats(
+        total=total['total'], closed=closed, open_n=total['open'],
+        won_n=won['total'], lost_n=lost['total'],
+        gross=pnl['gross']['total'], net=pnl['net']['total'],
+        gross_avg=pnl['gross']['average'], net_avg=pnl['net']['average'],
+        won_total=won_total, lost_total=lost_total,
+        long_n=long_['total'], short_n=short_['total'],
+        long_won=long_['won'], long_lost=long_['lost'],
+        short_won=short_['won'], short_lost=short_['lost'],
+        avg_hold=length['average'], max_hold=length['max'], min_hold=length['min'],
+        won_avg_hold=length['won']['average'], lost_avg_hold=length['lost']['average'],
+        won_avg=won['pnl']['average'], lost_avg_abs=abs(lost['pnl']['average']),
+        won_max=won['pnl']['max'], lost_max_abs=abs(lost['pnl']['max']),
+        won_streak=won_streak['longest'], lost_streak=lost_streak['longest'],
+        cur_won=won_streak['current'], cur_lost=lost_streak['current'],
+        win_rate=won['total'] / closed * 100 if closed > 0 else None,
+        pnl_ratio=abs(won_total / lost_total) if lost_total != 0 else None,
+    )
+
+def _as_stats(data):
+    """已是 TradeStats 时直接使用，否则从分析结果中提取"""
+    return data if isinstance(data, TradeStats) else derive_trade_stats(data)
+
+# 面板名称，按 3x2 网格从左到右、从上到下排列
+PANELS = ('distribution', 'pnl', 'side', 'hold', 'pnl_dist', 'streak')
+
+# 各面板的类别标签与配色
+_DIST_LABELS = ('盈利交易', '亏损交易', '未平仓交易')
+_DIST_COLORS = ('#2ecc71', '#e74c3c', '#f39c12')
+_PNL_LABELS = ('毛利', '净利')
+_PNL_COLORS = ('#3498db', '#9b59b6')
+_SIDE_LABELS = ('盈利', '亏损')
+_LONG_COLOR = '#3498db'
+_SHORT_COLOR = '#e74c3c'
+_HOLD_LABELS = ('平均持仓', '最长持仓', '最短持仓')
+_HOLD_COLORS = ('#f39c12', '#e67e22', '#d35400')
+_PNL_DIST_LABELS = ('平均盈利', '平均亏损', '最大盈利', '最大亏损')
+_PNL_DIST_COLORS = ('#2ecc71', '#e74c3c', '#27ae60', '#c0392b')
+_STREAK_LABELS = ('最长盈利连', '最长亏损连', '当前盈利连', '当前亏损连')
+_STREAK_COLORS = ('#27ae60', '#c0392b', '#2ecc71', '#e74c3c')
+
+def _bar_panel(ax, labels, colors, title, ylabel, rotate_x=False):
+    """在 ax 上建立高度为 0 的柱状图面板，返回柱子容器供 update 改值"""
+    n = len(labels)
+    bars = ax.bar(range(n), [0] * n, color=colors)
+    if rotate_x:
+        # 刻度标签在创建时就按 45° 右对齐，不再事后旋转
+        ax.set_xticks(range(n), labels, rotation=45, ha='right', fontproperties=_FP_LABEL)
+    else:
+        ax.set_xticks(range(n), labels, fontproperties=_FP_LABEL)
+    ax.set_title(title, fontproperties=_FP_TITLE)
+    ax.set_ylabel(ylabel, fontproperties=_FP_LABEL)
+    return bars
+
+class TradeReportView:
+    """
+    六面板交易分析图
     
-    pnl_categories = ['平均盈利', '平均亏损', '最大盈利', '最大亏损']
-    pnl_values = [won_pnl_avg, abs(lost_pnl_avg), won_pnl_max, abs(lost_pnl_max)]
-    pnl_colors = ['#2ecc71', '#e74c3c', '#27ae60', '#c0392b']
+    坐标轴、标题、配色与柱子在构造时一次建好，update() 只改柱子尺寸、数值标签与
+    坐标范围。同一个视图可反复 update() 后 savefig，重复渲染时不再重建 Figure 与 Axes。
     
-    bars = ax5.bar(pnl_categories, pnl_values, color=pnl_colors)
-    ax5.set_title('盈亏分布')
-    ax5.set_ylabel('金额')
-    ax5.tick_params(axis='x', rotation=45)
+    Args:
+        panels: 需要绘制的面板名称集合（见 PANELS），None 表示全部；未选中的面板隐藏且不建柱子
+    """
     
-    for bar, value in zip(bars, pnl_values):
-        height = bar.get_height()
-        ax5.text(bar.get_x() + bar.get_width()/2., height,
-                f'{value:,.2f}', ha='center', va='bottom', rotation=45)
+    def __init__(self, panels=None):
+        _setup_fonts()
+        panels = PANELS if panels is None else set(panels)
+        unknown = set(panels) - set(PANELS)
+        if unknown:
+            raise ValueError(f"未知的面板: {sorted(unknown)}，可选: {PANELS}")
+        
+        # 创建图形布局：直接构造 Figure 并绑定 Agg 画布，不经过 pyplot 与交互式后端
+        self.fig = fig = Figure(figsize=(16, 12))
+        FigureCanvasAgg(fig)
+        # 六个子图一次创建；3x2 布局固定，边距直接给定，不运行 tight_layout 求解
+        axes = dict(zip(PANELS, fig.subplots(3, 2).flat))
+        fig.subplots_adjust(left=0.07, right=0.97, bottom=0.08, top=0.94, wspace=0.25, hspace=0.45)
+        for name, ax in axes.items():
+            if name not in panels:
+                ax.set_visible(False)
+        
+        # 各面板的柱子容器，按面板名称索引
+        self._bars = {}
+        
+        # 1. 总体交易统计：三个类别用横向柱状图加“数量 (占比)”标签，信息与饼图相同但无需生成扇形几何
+        if 'distribution' in panels:
+            self._ax1 = axes['distribution']
+            self._bars['distribution'] = self._ax1.barh(range(3), [0] * 3, color=_DIST_COLORS)
+            self._ax1.set_yticks(range(3), _DIST_LABELS, fontproperties=_FP_LABEL)
+        
+        # 2. 盈亏金额统计
+        if 'pnl' in panels:
+            self._bars['pnl'] = _bar_panel(axes['pnl'], _PNL_LABELS, _PNL_COLORS, '盈亏金额统计', '金额')
+        
+        # 3. 多空交易统计：多头/空头两组柱子一次画出，顺序为 多头盈利、多头亏损、空头盈利、空头亏损
+        if 'side' in panels:
+            ax3 = axes['side']
+            width = 0.35
+            self._bars['side'] = ax3.bar((-width/2, 1 - width/2, width/2, 1 + width/2), [0] * 4, width,
+                                         color=(_LONG_COLOR, _LONG_COLOR, _SHORT_COLOR, _SHORT_COLOR))
+            ax3.set_xlabel('交易结果', fontproperties=_FP_LABEL)
+            ax3.set_ylabel('交易数量', fontproperties=_FP_LABEL)
+            ax3.set_title('多空交易统计', fontproperties=_FP_TITLE)
+            ax3.set_xticks([0, 1], _SIDE_LABELS, fontproperties=_FP_LABEL)
+            ax3.legend(handles=[Patch(color=_LONG_COLOR, label='多头'), Patch(color=_SHORT_COLOR, label='空头')],
+                       prop=_FP_LABEL)
+        
+        # 4. 持仓时间分析
+        if 'hold' in panels:
+            self._bars['hold'] = _bar_panel(axes['hold'], _HOLD_LABELS, _HOLD_COLORS, '持仓时间统计', '周期数')
+        
+        # 5. 盈亏分布
+        if 'pnl_dist' in panels:
+            self._bars['pnl_dist'] = _bar_panel(axes['pnl_dist'], _PNL_DIST_LABELS, _PNL_DIST_COLORS,
+                                                '盈亏分布', '金额', rotate_x=True)
+        
+        # 6. 连续盈亏统计
+        if 'streak' in panels:
+            self._bars['streak'] = _bar_panel(axes['streak'], _STREAK_LABELS, _STREAK_COLORS,
+                                              '连续盈亏统计', '连续次数', rotate_x=True)
+        
+        # 各面板上一次 update 的数值标签（下次改值前移除）与柱子数值；数值未变的面板整体跳过
+        self._labels = {}
+        self._state = {}
+        self._title_total = None
     
-    # 6. 连续盈亏统计
-    ax6 = fig.add_subplot(gs[2, 1])
-    won_streak = trade_dict['streak']['won']['longest']
-    lost_streak = trade_dict['streak']['lost']['longest']
-    current_won = trade_dict['streak']['won']['current']
-    current_lost = trade_dict['streak']['lost']['current']
+    def update(self, trade_data):
+        """
+        用一次回测的分析结果刷新图表
+        
+        Args:
+            trade_data: TradeAnalyzer的get_analysis()结果（AutoOrderedDict或字典），或 derive_trade_stats 的结果
+        
+        Returns:
+            绑定 Agg 画布的 Figure，不注册到 pyplot，由调用方 savefig 保存
+        """
+        st = _as_stats(trade_data)
+        
+        # 各面板的 (柱子数值, 标签格式化函数)，格式化函数为 None 的面板不加标签
+        sizes = [st.won_n, st.lost_n, st.open_n]
+        count = sum(sizes) or 1
+        pnl_values = [st.gross, st.net]
+        hold_values = [st.avg_hold, st.max_hold, st.min_hold]
+        pnl_dist_values = [st.won_avg, st.lost_avg_abs, st.won_max, st.lost_max_abs]
+        streak_values = [st.won_streak, st.lost_streak, st.cur_won, st.cur_lost]
+        panel_values = {
+            'distribution': (sizes, lambda s: f'{s} ({s * 100 / count:.1f}%)'),
+            'pnl': (pnl_values, '{:,.2f}'.format),
+            'side': ([st.long_won, st.long_lost, st.short_won, st.short_lost], None),
+            'hold': (hold_values, '{:.1f}'.format),
+            'pnl_dist': (pnl_dist_values, '{:,.2f}'.format),
+            'streak': (streak_values, '{}'.format),
+        }
+        
+        for name, bars in self._bars.items():
+            values, fmt = panel_values[name]
+            state = tuple(values)
+            if self._state.get(name) == state:
+                continue
+            self._state[name] = state
+            
+            ax = bars[0].axes
+            for label in self._labels.pop(name, ()):
+                label.remove()
+            self._set_values(bars, values, horizontal=name == 'distribution')
+            if fmt is not None:
+                self._labels[name] = ax.bar_label(bars, labels=[fmt(v) for v in values], padding=2,
+                                                  fontproperties=_FP_LABEL)
+            # 柱子尺寸变化后按新数据重新计算坐标范围
+            ax.relim()
+            ax.autoscale_view()
+        
+        if 'distribution' in self._bars and self._title_total != st.total:
+            self._title_total = st.total
+            self._ax1.set_title(f'交易分布 (总计: {st.total} 笔)', fontproperties=_FP_TITLE)
+        
+        return self.fig
     
-    streak_labels = ['最长盈利连', '最长亏损连', '当前盈利连', '当前亏损连']
-    streak_values = [won_streak, lost_streak, current_won, current_lost]
-    streak_colors = ['#27ae60', '#c0392b', '#2ecc71', '#e74c3c']
+    @staticmethod
+    def _set_values(bars, values, horizontal=False):
+        for bar, value in zip(bars, values):
+            if horizontal:
+                bar.set_width(value)
+            else:
+                bar.set_height(value)
+
+def visualize_trade_analyzer(trade_data, panels=None):
+    """
+    可视化交易分析器数据
     
-    bars = ax6.bar(streak_labels, streak_values, color=streak_colors)
-    ax6.set_title('连续盈亏统计')
-    ax6.set_ylabel('连续次数')
-    ax6.tick_params(axis='x', rotation=45)
+    Args:
+        trade_data: TradeAnalyzer的get_analysis()结果（AutoOrderedDict或字典），或 derive_trade_stats 的结果
+        panels: 需要绘制的面板名称集合（见 PANELS），None 表示全部
+
+    Returns:
+        绑定 Agg 画布的 Figure，不注册到 pyplot，由调用方 savefig 保存
+    """
+    return TradeReportView(panels).update(trade_data)
+
+def render_png(trade_data, path, panels=None):
+    """
+    绘制交易分析图并直接保存为 PNG
     
-    for bar, value in zip(bars, streak_values):
-        height = bar.get_height()
-        ax6.text(bar.get_x() + bar.get_width()/2., height,
-                f'{value}', ha='center', va='bottom')
+    在 Agg 画布上绘制一次后取出 RGBA 缓冲区，由 Pillow 以低压缩级别编码，
+    不再经过 savefig 的重绘与默认压缩级别；文件略大，编码更快。
     
-    plt.tight_layout()
-    return fig
+    Args:
+        trade_data: TradeAnalyzer的get_analysis()结果（AutoOrderedDict或字典），或 derive_trade_stats 的结果
+        path: PNG 文件路径或可写的二进制文件对象
+        panels: 需要绘制的面板名称集合（见 PANELS），None 表示全部
+    """
+    canvas = visualize_trade_analyzer(trade_data, panels).canvas
+    canvas.draw()
+    Image.fromarray(np.asarray(canvas.buffer_rgba())).save(path, 'PNG', compress_level=1)
 
 def create_detailed_report(data):
     """
     创建详细的交易分析报告
     
     Args:
-        data: TradeAnalyzer数据
+        data: TradeAnalyzer数据，或 derive_trade_stats 的结果
     """
+    # 没有任何交易时（回测初期常见）直接返回空报告；此时 TradeAnalyzer 只有 total 一项
+    if _is_empty(data):
+        report = _EMPTY_REPORT
+    else:
+        report = _build_report(_as_stats(data))
+    # 相同数值（如重复渲染同一次回测）直接复用已格式化的结果；
+    # 缓存中的结果是共享的，返回副本以免调用方修改影响后续调用
+    return {category: dict(stats) for category, stats in report.items()}
+
+def _is_empty(data):
+    """是否既无已平仓也无未平仓交易"""
+    if isinstance(data, TradeStats):
+        return data.closed == 0 and data.open_n == 0
+    # 用 get 读取：AutoOrderedDict 下标访问缺失的键会新建空节点而不是返回 0
+    total = data['total']
+    return total.get('closed', 0) == 0 and total.get('open', 0) == 0
+
+@functools.lru_cache(maxsize=32)
+def _build_report(st):
+    """格式化 TradeStats 为分类报告"""
     report = {
         '总体统计': {
-            '总交易数': data['total']['total'],
-            '已平仓交易': data['total']['closed'],
-            '未平仓交易': data['total']['open'],
-            '盈利交易数': data['won']['total'],
-            '亏损交易数': data['lost']['total'],
-            '胜率': f"{(data['won']['total'] / data['total']['closed'] * 100):.1f}%" if data['total']['closed'] > 0 else 'N/A'
+            '总交易数': st.total,
+            '已平仓交易': st.closed,
+            '未平仓交易': st.open_n,
+            '盈利交易数': st.won_n,
+            '亏损交易数': st.lost_n,
+            '胜率': f"{st.win_rate:.1f}%" if st.win_rate is not None else 'N/A'
         },
         '盈亏统计': {
-            '总毛利': f"{data['pnl']['gross']['total']:,.2f}",
-            '总净利': f"{data['pnl']['net']['total']:,.2f}",
-            '平均毛利': f"{data['pnl']['gross']['average']:,.2f}",
-            '平均净利': f"{data['pnl']['net']['average']:,.2f}",
-            '总盈利金额': f"{data['won']['pnl']['total']:,.2f}",
-            '总亏损金额': f"{data['lost']['pnl']['total']:,.2f}",
-            '盈亏比': f"{(abs(data['won']['pnl']['total'] / data['lost']['pnl']['total'])):.2f}:1" if data['lost']['pnl']['total'] != 0 else 'N/A'
+            '总毛利': f"{st.gross:,.2f}",
+            '总净利': f"{st.net:,.2f}",
+            '平均毛利': f"{st.gross_avg:,.2f}",
+            '平均净利': f"{st.net_avg:,.2f}",
+            '总盈利金额': f"{st.won_total:,.2f}",
+            '总亏损金额': f"{st.lost_total:,.2f}",
+            '盈亏比': f"{st.pnl_ratio:.2f}:1" if st.pnl_ratio is not None else 'N/A'
         },
         '多空统计': {
-            '多头交易数': data['long']['total'],
-            '空头交易数': data['short']['total'],
-            '多头盈利数': data['long']['won'],
-            '多头亏损数': data['long']['lost'],
-            '空头盈利数': data['short']['won'],
-            '空头亏损数': data['short']['lost']
+            '多头交易数': st.long_n,
+            '空头交易数': st.short_n,
+            '多头盈利数': st.long_won,
+            '多头亏损数': st.long_lost,
+            '空头盈利数': st.short_won,
+            '空头亏损数': st.short_lost
         },
         '持仓时间': {
-            '平均持仓周期': f"{data['len']['average']:.1f}",
-            '最长持仓周期': data['len']['max'],
-            '最短持仓周期': data['len']['min'],
-            '盈利交易平均持仓': f"{data['len']['won']['average']:.1f}",
-            '亏损交易平均持仓': f"{data['len']['lost']['average']:.1f}"
+            '平均持仓周期': f"{st.avg_hold:.1f}",
+            '最长持仓周期': st.max_hold,
+            '最短持仓周期': st.min_hold,
+            '盈利交易平均持仓': f"{st.won_avg_hold:.1f}",
+            '亏损交易平均持仓': f"{st.lost_avg_hold:.1f}"
         },
         '连续统计': {
-            '最长盈利连': data['streak']['won']['longest'],
-            '最长亏损连': data['streak']['lost']['longest'],
-            '当前盈利连': data['streak']['won']['current'],
-            '当前亏损连': data['streak']['lost']['current']
+            '最长盈利连': st.won_streak,
+            '最长亏损连': st.lost_streak,
+            '当前盈利连': st.cur_won,
+            '当前亏损连': st.cur_lost
         }
     }
     
     return report
 
+# 无交易时的报告：计数为 0，其余统计均无意义
+_EMPTY_REPORT = {
+    '总体统计': {
+        '总交易数': 0, '已平仓交易': 0, '未平仓交易': 0, '盈利交易数': 0, '亏损交易数': 0, '胜率': 'N/A'
+    },
+    '盈亏统计': dict.fromkeys(('总毛利', '总净利', '平均毛利', '平均净利', '总盈利金额', '总亏损金额', '盈亏比'), 'N/A'),
+    '多空统计': dict.fromkeys(('多头交易数', '空头交易数', '多头盈利数', '多头亏损数', '空头盈利数', '空头亏损数'), 0),
+    '持仓时间': dict.fromkeys(('平均持仓周期', '最长持仓周期', '最短持仓周期', '盈利交易平均持仓', '亏损交易平均持仓'), 'N/A'),
+    '连续统计': dict.fromkeys(('最长盈利连', '最长亏损连', '当前盈利连', '当前亏损连'), 0),
+}
+
 def print_trade_report(report):
     """打印交易报告"""
-    print("=" * 60)
-    print("交易分析报告")
-    print("=" * 60)
-    
+    # 整份报告拼好后一次写出
+    out = ["=" * 60, "交易分析报告", "=" * 60]
     for category, stats in report.items():
-        print(f"\n{category}:")
-        print("-" * 40)
-        for key, value in stats.items():
-            print(f"  {key}: {value}")
-
+        out.append(f"\n{category}:")
+        out.append("-" * 40)
+        out.extend(f"  {key}: {value}" for key, value in stats.items())
+    out.append("")
+    sys.stdout.write("\n".join(out))